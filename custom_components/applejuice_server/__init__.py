@@ -2,16 +2,27 @@
 
 import asyncio
 import logging
-import re
-import xmltodict
+import os
+import time
+from collections import deque
+from collections.abc import Callable
 from datetime import timedelta
 
+import voluptuous as vol
+from aiohttp import ClientTimeout, hdrs, web
+from http import HTTPStatus
+
+from homeassistant.components import webhook
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
+from homeassistant.const import CONF_WEBHOOK_ID, EVENT_HOMEASSISTANT_CLOSE, Platform
+from homeassistant.core import Event, HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr, entity_registry as er
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 from .const import (
     DOMAIN,
     CONF_URL,
@@ -21,21 +32,115 @@ from .const import (
     CONF_TLS,
     PLATFORMS,
     CONF_OPTION_POLLING_RATE,
+    CONF_OPTION_INFO_POLLING_RATE,
+    CONF_OPTION_ADAPTIVE_POLLING,
+    CONF_OPTION_POLLING_RATE_MIN,
+    CONF_OPTION_POLLING_RATE_MAX,
+    CONF_OPTION_PUSH_MODE,
+    CONF_OPTION_MAX_RESPONSE_SIZE,
+    CONF_OPTION_STREAM_PARSING,
+    CONF_OPTION_STATISTICS_IMPORT,
+    CONF_OPTION_CONNECT_TIMEOUT,
+    CONF_OPTION_READ_TIMEOUT,
+    CONF_OPTION_INFO_CONNECT_TIMEOUT,
+    CONF_OPTION_INFO_READ_TIMEOUT,
+    CONF_OPTION_HEDGED_REQUESTS,
+    DATA_SCHEDULER,
+    DATA_NETWORK,
+    STORAGE_VERSION,
+    SNAPSHOT_SAVE_DELAY,
+    DEFAULT_POLLING_RATE,
+    DEFAULT_POLLING_RATE_MIN,
+    DEFAULT_POLLING_RATE_MAX,
+    LIVENESS_POLLING_RATE,
+    MAX_PUSH_SIZE,
+    DEFAULT_MAX_RESPONSE_SIZE,
+    ENDPOINT_INFO,
+    ENDPOINT_STATUS,
     TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HISTORY_ATTRIBUTE_WINDOW,
+    SERVICE_HISTORY_STATS,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_METRIC,
+    ATTR_WINDOW,
+    ATTR_PERCENTILES,
+)
+
+from .adaptive import AdaptiveInterval
+from .anomaly import AnomalyDetector
+from .api import AppleJuiceClient, EndpointCache, async_get_coalescer
+from .breaker import CircuitOpenError
+from .forecast import MemoryForecast
+from .history import HISTORY_METRICS, MetricHistory, percentile
+from .metrics import AppleJuiceMetricsView
+from .parser import (
+    NETWORK_INFO_FIELDS,
+    SERVER_INFO_FIELDS,
+    InfoParser,
+    StatusParser,
+    parse_info,
+    parse_status,
+    parse_status_json,
 )
+from .rates import CounterRates
+from .scheduler import AppleJuiceScheduler
+from .statistics import STATISTICS_NETWORK, STATISTICS_SERVER, HourlyStatistics, async_import_hour
+from .timing import TIMING_SAMPLES, RollingTimings
 
-from .api import get_raw_data
+# an endpoint counts as due this close to its interval, so timer jitter does not skip a whole tick
+INTERVAL_TOLERANCE = 1
+KEEPALIVE_MARGIN = 15
 
-SCAN_INTERVAL = timedelta(seconds=30)
 
 _LOGGER = logging.getLogger(__name__)
 
 _LOGGER.debug("loading appleJuice Server init")
 
 
+HISTORY_STATS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_METRIC): vol.In(HISTORY_METRICS),
+        vol.Required(ATTR_WINDOW): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_PERCENTILES, default=[50, 95]): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0, max=100))]
+        ),
+    }
+)
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the appleJuice Server integration."""
     hass.data.setdefault(DOMAIN, {})
+
+    async def async_history_stats(call: ServiceCall) -> ServiceResponse:
+        """Return windowed statistics from the metric history of a server."""
+        coordinator = hass.data[DOMAIN].get(call.data[ATTR_CONFIG_ENTRY_ID])
+        if not isinstance(coordinator, AppleJuiceCoordinator) or coordinator.history is None:
+            raise ServiceValidationError(f"No appleJuice Server loaded for {call.data[ATTR_CONFIG_ENTRY_ID]}")
+
+        metrics = [call.data[ATTR_METRIC]] if ATTR_METRIC in call.data else coordinator.history.metrics
+        since = time.time() - call.data[ATTR_WINDOW]
+
+        return {
+            metric: coordinator.history.stats(metric, since, tuple(call.data[ATTR_PERCENTILES]))
+            for metric in metrics
+        }
+
+    hass.http.register_view(AppleJuiceMetricsView())
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_HISTORY_STATS,
+        async_history_stats,
+        schema=HISTORY_STATS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
     return True
 
 
@@ -71,157 +176,640 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the metric history and the snapshot of a deleted entry, and the network statistics with the last one."""
+    path = _history_path(hass, entry)
+    if await hass.async_add_executor_job(os.path.exists, path):
+        await hass.async_add_executor_job(os.remove, path)
+
+    await _snapshot_store(hass, entry).async_remove()
+
+    if all(other.entry_id == entry.entry_id for other in hass.config_entries.async_entries(DOMAIN)):
+        await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{DATA_NETWORK}").async_remove()
+
+
+def _history_path(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry.entry_id}.history")
+
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot")
+
+
+@callback
+def _async_remove_legacy_network_entities(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the network sensors and device every entry used to have, the network coordinator owns them now."""
+    entity_registry = er.async_get(hass)
+    for key in NETWORK_INFO_FIELDS:
+        entity_id = entity_registry.async_get_entity_id(Platform.SENSOR, DOMAIN, f"{entry.entry_id}_{key}")
+        if entity_id is not None:
+            entity_registry.async_remove(entity_id)
+
+    device_registry = dr.async_get(hass)
+    device = device_registry.async_get_device(identifiers={(DOMAIN, entry.entry_id, "network")})
+    if device is not None:
+        device_registry.async_remove_device(device.id)
+
+
+@callback
+def _async_add_statistics(hass: HomeAssistant, statistics: HourlyStatistics, data: dict) -> None:
+    """Add the data to the running hour, and import the previous hour once it is over."""
+    completed = statistics.add(data, dt_util.utcnow())
+    if completed is not None:
+        hass.async_create_background_task(async_import_hour(hass, statistics, *completed),
+                                          f"{statistics.name} statistics import")
+
+
+@callback
+def _async_restore_statistics(hass: HomeAssistant, statistics: HourlyStatistics, saved: dict | None) -> None:
+    """Continue the running hour saved before a reload or restart, or import it once it is over."""
+    completed = statistics.restore(saved, dt_util.utcnow())
+    if completed is not None:
+        hass.async_create_background_task(async_import_hour(hass, statistics, *completed),
+                                          f"{statistics.name} statistics import")
+
+
+@callback
+def _async_remove_network_source(hass: HomeAssistant, coordinator):
+    """Stop taking the network statistics from an unloaded entry, and drop them after the last one.
+
+    Returns the save of their running statistics hour after the last one.
+    """
+    network = coordinator.network
+    network.async_remove_source(coordinator)
+    if not network.sources:
+        hass.data[DOMAIN].pop(DATA_NETWORK, None)
+        if network.statistics is not None:
+            return network.store.async_save(network.statistics_snapshot())
+    return None
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up this integration using UI."""
-
-    global SCAN_INTERVAL
+    start = time.monotonic()
 
     if hass.data.get(DOMAIN) is None:
         hass.data.setdefault(DOMAIN, {})
 
-    if entry.options.get(CONF_OPTION_POLLING_RATE) is not None:
-        SCAN_INTERVAL = timedelta(seconds=entry.options.get(CONF_OPTION_POLLING_RATE))
-    else:
-        SCAN_INTERVAL = timedelta(seconds=30)
+    # shared by all entries, next to the coordinators keyed by entry_id
+    scheduler = hass.data[DOMAIN].get(DATA_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DOMAIN][DATA_SCHEDULER] = AppleJuiceScheduler(hass)
+
+    coordinator = AppleJuiceCoordinator(hass, config_entry=entry, scheduler=scheduler)
+    entry.async_on_unload(coordinator.async_close)
 
-    coordinator = AppleJuiceCoordinator(hass, config_entry=entry)
+    # entries are not unloaded when Home Assistant stops, the client holds its own session
+    async def _async_close_client(event: Event) -> None:
+        await coordinator.client.async_close()
 
-    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_client))
 
-    await coordinator.async_refresh()
+    # the network statistics are the same on every server, they are taken from the info refresh of any entry
+    network = hass.data[DOMAIN].get(DATA_NETWORK)
+    if network is None:
+        network = hass.data[DOMAIN][DATA_NETWORK] = AppleJuiceNetworkCoordinator(hass)
+    coordinator.network = network
+    await network.async_add_source(coordinator)
+    entry.async_on_unload(lambda: _async_remove_network_source(hass, coordinator))
 
-    if not coordinator.last_update_success:
-        raise ConfigEntryNotReady
+    coordinator.history = await hass.async_add_executor_job(MetricHistory, _history_path(hass, entry))
+
+    # start from the last saved data and refresh in the background, or wait for a first refresh without one
+    if await coordinator.async_restore_snapshot():
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{coordinator.name} refresh")
+    else:
+        # the only refresh during setup, raises ConfigEntryNotReady on failure, the platforms reuse its data
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    _async_remove_legacy_network_entities(hass, entry)
+
     for platform in PLATFORMS:
         coordinator.platforms.append(platform)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    scheduler.async_add(coordinator)
+    entry.async_on_unload(lambda: scheduler.async_remove(coordinator))
+
+    if coordinator.push_mode:
+        webhook_id = entry.options[CONF_WEBHOOK_ID]
+        webhook.async_register(hass, DOMAIN, coordinator.name, webhook_id, coordinator.async_handle_webhook,
+                               local_only=False, allowed_methods=[hdrs.METH_POST])
+        entry.async_on_unload(lambda: webhook.async_unregister(hass, webhook_id))
+
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
+    coordinator.setup_time = time.monotonic() - start
+    _LOGGER.debug("%s set up in %.3fs", coordinator.name, coordinator.setup_time)
+
     return True
 
 
 class AppleJuiceCoordinator(DataUpdateCoordinator):
     """Handles periodic XML data retrieval."""
 
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry):
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, scheduler: AppleJuiceScheduler):
         """Initialize the coordinator with update interval settings."""
         self.system = None
         self.version = None
         self.platforms = []
-        self.updaters = [
-            _async_update_info,
-            _async_update_status,
-        ]
+        self.updaters = {
+            ENDPOINT_INFO: _async_update_info,
+            ENDPOINT_STATUS: _async_update_status,
+        }
+        self.endpoint_latency = {}
+        self.endpoint_last_update = {}
+        self.endpoint_caches = {endpoint: EndpointCache() for endpoint in self.updaters}
+        self.response_sizes = {endpoint: deque(maxlen=TIMING_SAMPLES) for endpoint in self.updaters}
+        self.latency_samples = {endpoint: deque(maxlen=TIMING_SAMPLES) for endpoint in self.updaters}
+        self.timings = RollingTimings()
+        self.setup_time = None
+        self.stale = False
+        self.rates = CounterRates()
+        self.anomaly = AnomalyDetector()
+        self.memory_forecast = MemoryForecast()
+        self.history = None
+        self.history_stats = {}
+        self.changed_keys = None
+        self._notified_success = None
         self.hass = hass
         self.config_entry = config_entry
+        self.scheduler = scheduler
+        self.schedule_id = config_entry.entry_id
+        self.network = None
+        self.snapshot_store = _snapshot_store(hass, config_entry)
+        self._snapshot_pending = False
 
         self.name = f"appleJuice Server {config_entry.data.get(CONF_URL)}:{config_entry.data.get(CONF_PORT)}"
 
-        super().__init__(hass, _LOGGER, name=self.name, update_interval=SCAN_INTERVAL, always_update=False)
+        # options saved before the rates were validated may hold 0 or less, which would poll in a tight loop
+        polling_rate = max(1, config_entry.options.get(CONF_OPTION_POLLING_RATE, DEFAULT_POLLING_RATE))
+        info_polling_rate = max(1, config_entry.options.get(CONF_OPTION_INFO_POLLING_RATE, polling_rate))
+        self.endpoint_intervals = {
+            ENDPOINT_INFO: timedelta(seconds=info_polling_rate),
+            ENDPOINT_STATUS: timedelta(seconds=polling_rate),
+        }
+
+        self.poll_interval = min(self.endpoint_intervals.values())
+
+        # a slow connect and a slow body are told apart, the overall TIMEOUT still applies
+        connect_timeout = config_entry.options.get(CONF_OPTION_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)
+        read_timeout = config_entry.options.get(CONF_OPTION_READ_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        self.endpoint_timeouts = {
+            ENDPOINT_INFO: ClientTimeout(
+                sock_connect=config_entry.options.get(CONF_OPTION_INFO_CONNECT_TIMEOUT, connect_timeout),
+                sock_read=config_entry.options.get(CONF_OPTION_INFO_READ_TIMEOUT, read_timeout),
+            ),
+            ENDPOINT_STATUS: ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+        }
+        self.hedged_requests = config_entry.options.get(CONF_OPTION_HEDGED_REQUESTS, False)
+
+        self.push_mode = config_entry.options.get(CONF_OPTION_PUSH_MODE, False)
+        self.stream_parsing = config_entry.options.get(CONF_OPTION_STREAM_PARSING, False)
+        self.statistics = None
+        if config_entry.options.get(CONF_OPTION_STATISTICS_IMPORT, False):
+            if "recorder" in hass.config.components:
+                self.statistics = HourlyStatistics(STATISTICS_SERVER, config_entry.entry_id.lower(), self.name)
+            else:
+                _LOGGER.warning("%s can only import statistics with the recorder set up", self.name)
+        self.adaptive = None
+        if self.push_mode:
+            # the server pushes its status, polling only notices when it stops
+            self._set_status_interval(LIVENESS_POLLING_RATE)
+        elif config_entry.options.get(CONF_OPTION_ADAPTIVE_POLLING, False):
+            self.adaptive = AdaptiveInterval(
+                config_entry.options.get(CONF_OPTION_POLLING_RATE_MIN, DEFAULT_POLLING_RATE_MIN),
+                config_entry.options.get(CONF_OPTION_POLLING_RATE_MAX, DEFAULT_POLLING_RATE_MAX),
+                polling_rate,
+            )
+            self._set_status_interval(self.adaptive.interval)
+
+        # polling is driven by the AppleJuiceScheduler, not by the coordinator itself
+        super().__init__(hass, _LOGGER, name=self.name, update_interval=None, always_update=False)
+
+        # keep connections open across polls, a closed one costs a new TCP and TLS handshake
+        self.client = AppleJuiceClient(config_entry.data.get(CONF_URL),
+                                       config_entry.data.get(CONF_PORT),
+                                       config_entry.data.get(CONF_USERNAME),
+                                       config_entry.data.get(CONF_PASSWORD),
+                                       config_entry.data.get(CONF_TLS),
+                                       keepalive_timeout=self._longest_poll_interval() + KEEPALIVE_MARGIN,
+                                       max_size=config_entry.options.get(CONF_OPTION_MAX_RESPONSE_SIZE,
+                                                                         DEFAULT_MAX_RESPONSE_SIZE // 1024) * 1024,
+                                       coalescer=async_get_coalescer(hass))
 
     async def _async_update_data(self):
         """Update data via library."""
-        combined_data = {}
-
-        for updater in self.updaters:
-            data = await updater(self)
+        try:
+            return await self._async_fetch_data()
+        except UpdateFailed:
+            # no update is sent while failures continue, but the circuit breaker entities still change
+            if not self.last_update_success:
+                self._async_update_unsubscribed_listeners()
+            raise
+
+    async def _async_fetch_data(self):
+        """Fetch the due endpoints and combine their data, the data stays the same object when nothing was fetched."""
+        start = time.monotonic()
+        due = [endpoint for endpoint in self.updaters if self._is_due(endpoint, start)]
+        if not due:
+            self.changed_keys = set()
+            return self.data
+
+        # an unreachable server costs no request until its next probe is due
+        if not self.client.breaker.allow():
+            if ENDPOINT_INFO in due:
+                self.network.async_set_source_failed(self)
+            raise UpdateFailed(f"{self.name} is unreachable, next probe in {self.client.breaker.retry_in:.0f}s")
+
+        results = await asyncio.gather(
+            *[self._async_run_updater(endpoint, self.updaters[endpoint]) for endpoint in due]
+        )
+        _LOGGER.debug("%s refreshed %s in %.3fs", self.name, due, time.monotonic() - start)
+
+        failed = []
+        for endpoint, data in zip(due, results):
+            if data is None:
+                failed.append(endpoint)
+            else:
+                self.endpoint_last_update[endpoint] = start
+
+        # keep the last good values of a failed endpoint, but only once there are some
+        if len(failed) == len(due) or (failed and self.data is None):
+            raise UpdateFailed(f"Error fetching {', '.join(failed)} from {self.name}")
+
+        status = dict(zip(due, results)).get(ENDPOINT_STATUS)
+        if self.adaptive is not None and status is not None:
+            self._set_status_interval(self.adaptive.update(status))
+
+        # the fan-out of this refresh is only timed after it, so it shows up with the next one
+        self.timings.record("update", time.monotonic() - start)
+
+        return self._combine(results, start, complete=not failed)
+
+    @callback
+    def async_push_status(self, text: str | None = None, payload: dict | None = None) -> None:
+        """Take a status pushed by the server, either the raw status page or a JSON object.
+
+        Raises ValueError when the push carries no status values.
+        """
+        start = time.monotonic()
+        status = parse_status(text) if text is not None else parse_status_json(payload)
+        self.timings.record("parse", time.monotonic() - start)
+
+        if not any(value is not None for key, value in status.items() if key != "serverstatus_ok"):
+            raise ValueError("no status values found")
+
+        # a push counts as a poll of the status page, the liveness check only runs once pushes stop
+        self.endpoint_last_update[ENDPOINT_STATUS] = start
+        self.async_set_updated_data(self._combine([status], start, complete=False))
+
+    async def async_handle_webhook(self, hass: HomeAssistant, webhook_id: str, request: web.Request) -> web.Response:
+        """Handle a status pushed to the webhook, JSON when sent as application/json, else the raw status page."""
+        if request.content_length is not None and request.content_length > MAX_PUSH_SIZE:
+            return web.Response(status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        # a chunked body has no length up front, it is read until it gets too large
+        body = b""
+        while chunk := await request.content.read(MAX_PUSH_SIZE + 1 - len(body)):
+            body += chunk
+            if len(body) > MAX_PUSH_SIZE:
+                return web.Response(status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        try:
+            if request.content_type == "application/json":
+                self.async_push_status(payload=json_loads(body))
+            else:
+                self.async_push_status(text=body.decode(request.charset or "utf-8", errors="replace"))
+        except (ValueError, OverflowError, LookupError) as e:
+            # LookupError for an unknown charset
+            _LOGGER.warning("Invalid status pushed to %s: %s", self.name, e)
+            return web.Response(status=HTTPStatus.BAD_REQUEST, text=str(e))
+
+        return web.Response(status=HTTPStatus.OK)
+
+    def _combine(self, results: list, timestamp: float, complete: bool) -> dict:
+        """Merge endpoint results into the current data, and record and save the new data.
+
+        `complete` is set when every endpoint answered, only then restored values stop being stale.
+        """
+        combined_data = dict(self.data or {})
+
+        for data in results:
             if data is not None:
                 combined_data.update(data)
+                combined_data.update(self.rates.update(data, timestamp))
+                combined_data.update(self.anomaly.update(data))
+                combined_data.update(self.memory_forecast.update(data, timestamp))
 
-        _LOGGER.debug("combined_data: %s", combined_data)
-
-        return combined_data
-
-
-async def _async_update_info(self):
-    """Fetch XML data asynchronously."""
-    infoData = await get_raw_data(self.hass,
-                                  self.config_entry.data.get(CONF_URL),
-                                  self.config_entry.data.get(CONF_PORT),
-                                  self.config_entry.data.get(CONF_USERNAME),
-                                  self.config_entry.data.get(CONF_PASSWORD),
-                                  self.config_entry.data.get(CONF_TLS),
-                                  "/info.xml")
-
-    parsed_data = xmltodict.parse(infoData)
-
-    applejuiceserver = parsed_data.get("applejuiceserver")
-
-    return {
-        "globaluser": int(applejuiceserver.get("globaluser")) if applejuiceserver is not None else None,
-        "globalfilecount": int(applejuiceserver.get("globalfilecount")) if applejuiceserver is not None else None,
-        "globalfilesize": int(float(applejuiceserver.get("globalfilesize"))) if applejuiceserver is not None else None,
-        "user": int(applejuiceserver.get("user")) if applejuiceserver is not None else None,
-        "filecount": int(applejuiceserver.get("filecount")) if applejuiceserver is not None else None,
-        "filesize": int(float(applejuiceserver.get("filesize"))) if applejuiceserver is not None else None,
-    }
-
+        combined_data["polling_interval"] = self.poll_interval.total_seconds()
+        combined_data.update(self.timings.summary())
 
-async def _async_update_status(self):
-    """Fetch XML share data asynchronously."""
-    statusData = await get_raw_data(self.hass,
-                                    self.config_entry.data.get(CONF_URL),
-                                    self.config_entry.data.get(CONF_PORT),
-                                    self.config_entry.data.get(CONF_USERNAME),
-                                    self.config_entry.data.get(CONF_PASSWORD),
-                                    self.config_entry.data.get(CONF_TLS),
-                                    "/status_raw.htm")
+        _LOGGER.debug("combined_data: %s", combined_data)
 
-    parsedData = {}
+        self.changed_keys = self._changed_keys(combined_data)
 
-    firewalled = re.compile(r'users \((\d+) firewalled\) share').search(statusData)
-    parsedData['firewalled'] = int(firewalled.group(1)) if firewalled else None
+        # every entity has to drop its stale mark, not only those whose values changed
+        if self.stale and complete:
+            self.stale = False
+            self.changed_keys = None
 
-    open_connections = re.compile(r'open connections: (\d+)').search(statusData)
-    parsedData['open_connections'] = int(open_connections.group(1)) if open_connections else None
+        if self.history is not None:
+            now = time.time()
+            self.history.append(now, combined_data)
+            # once per refresh here, instead of on every state write of every sensor
+            self.history_stats = {
+                metric: self.history.stats(metric, now - HISTORY_ATTRIBUTE_WINDOW) for metric in self.history.metrics
+            }
 
-    memory_used = re.compile(r'used: (\d+) ').search(statusData)
-    parsedData['memory_used'] = int(memory_used.group(1)) if memory_used else None
+        if self.statistics is not None:
+            _async_add_statistics(self.hass, self.statistics, combined_data)
 
-    memory_free = re.compile(r'free: (\d+) ').search(statusData)
-    parsedData['memory_free'] = int(memory_free.group(1)) if memory_free else None
+        # the store postpones a pending save on every call, so polls faster than the delay would never save
+        if not self._snapshot_pending:
+            self._snapshot_pending = True
+            self.snapshot_store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
 
-    memory_max = re.compile(r'max : (\d+) ').search(statusData)
-    parsedData['memory_max'] = int(memory_max.group(1)) if memory_max else None
+        return combined_data
 
-    upspeed_last_10_sec = re.compile(r'upspeed last 10 sec: (\d+\.\d+) ').search(statusData)
-    parsedData['upspeed_last_10_sec'] = float(upspeed_last_10_sec.group(1)) if upspeed_last_10_sec else None
+    async def async_restore_snapshot(self) -> bool:
+        """Seed the data with the last saved snapshot, marked as stale until the next successful refresh.
+
+        The restored values are only shown until the first refresh, if that fails the entities become unavailable.
+        """
+        snapshot = await self.snapshot_store.async_load()
+        if not snapshot:
+            return False
+
+        # the anomaly models and the running statistics hour carry on even without data to show
+        self.anomaly.restore(snapshot.get("anomaly"))
+        if self.statistics is not None:
+            _async_restore_statistics(self.hass, self.statistics, snapshot.get("statistics"))
+        if not snapshot.get("data"):
+            return False
+
+        _LOGGER.debug("%s restored snapshot from %s", self.name, snapshot.get("saved_at"))
+        self.data = snapshot["data"]
+        self.stale = True
+        return True
 
-    downspeed_last_10_sec = re.compile(r'downspeed last 10 sec: (\d+\.\d+) ').search(statusData)
-    parsedData['downspeed_last_10_sec'] = float(downspeed_last_10_sec.group(1)) if downspeed_last_10_sec else None
+    @callback
+    def _snapshot(self) -> dict:
+        """Data to save, called by the store once the save delay has passed."""
+        self._snapshot_pending = False
+        return {
+            "saved_at": time.time(),
+            "data": self.data,
+            "anomaly": self.anomaly.as_dict(),
+            "statistics": self.statistics.as_dict() if self.statistics is not None else None,
+        }
+
+    async def async_close(self) -> None:
+        """Save the snapshot, close the connection and the metric history."""
+        # the running statistics hour would be lost with a reload before the next delayed save
+        if self.data is not None:
+            await self.snapshot_store.async_save(self._snapshot())
+        await self.client.async_close()
+        if self.history is not None:
+            await self.hass.async_add_executor_job(self.history.close)
+            self.history = None
+
+    def _changed_keys(self, data: dict) -> set:
+        """Keys whose value differs from the current data."""
+        previous = self.data or {}
+        return {key for key, value in data.items() if key not in previous or previous[key] != value}
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the entities subscribed to a changed key, or all of them when availability changed.
+
+        Entities pass their subscriptions as listener context, a context of None is always notified.
+        """
+        if self.last_update_success != self._notified_success or not self.last_update_success:
+            self._notified_success = self.last_update_success
+            self.changed_keys = None
+
+        start = time.monotonic()
+
+        if self.changed_keys is None:
+            super().async_update_listeners()
+        else:
+            for update_callback, context in list(self._listeners.values()):
+                if context is None or not self.changed_keys.isdisjoint(context):
+                    update_callback()
+
+        self.timings.record("fan_out", time.monotonic() - start)
+
+    @callback
+    def _async_update_unsubscribed_listeners(self) -> None:
+        """Notify the entities without subscriptions, they show state kept outside of the data."""
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                update_callback()
+
+    def _longest_poll_interval(self) -> float:
+        """Longest time between two polls, connections must stay alive at least that long."""
+        if self.adaptive is not None:
+            return max(self.adaptive.maximum, self.poll_interval.total_seconds())
+        return self.poll_interval.total_seconds()
+
+    def _set_status_interval(self, seconds: float) -> None:
+        """Change how often the status page is polled, the scheduler picks it up with the next poll."""
+        self.endpoint_intervals[ENDPOINT_STATUS] = timedelta(seconds=seconds)
+        self.poll_interval = min(self.endpoint_intervals.values())
+
+    def hedge_after(self, endpoint) -> float | None:
+        """Seconds after which a request to an endpoint is hedged, None without hedging or enough samples."""
+        samples = self.latency_samples[endpoint]
+        if not self.hedged_requests or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(sorted(samples), HEDGE_PERCENTILE)
+
+    def _is_due(self, endpoint, now) -> bool:
+        """Check if the polling interval of an endpoint has passed."""
+        last_update = self.endpoint_last_update.get(endpoint)
+        if last_update is None:
+            return True
+        return now - last_update >= self.endpoint_intervals[endpoint].total_seconds() - INTERVAL_TOLERANCE
+
+    async def _async_run_updater(self, endpoint, updater):
+        """Run a single endpoint updater with its own timeout and record its latency and timings."""
+        start = time.monotonic()
+        try:
+            async with self.scheduler.async_request_slot():
+                start = time.monotonic()
+                async with asyncio.timeout(TIMEOUT):
+                    data = await updater(self)
+        except CircuitOpenError as e:
+            _LOGGER.debug("Skipped updating %s from %s: %s", endpoint, self.name, e)
+            self._async_endpoint_failed(endpoint)
+            return None
+        except Exception as e:
+            _LOGGER.warning("Error updating %s from %s: %s", endpoint, self.name, e)
+            self._async_endpoint_failed(endpoint)
+            return None
+        finally:
+            self.endpoint_latency[endpoint] = time.monotonic() - start
+            _LOGGER.debug("%s %s took %.3fs", self.name, endpoint, self.endpoint_latency[endpoint])
+
+        self.latency_samples[endpoint].append(self.endpoint_latency[endpoint])
+
+        cache = self.endpoint_caches[endpoint]
+        self.timings.record("network", cache.network_time)
+        self.timings.record("parse", cache.parse_time)
+        self.response_sizes[endpoint].append(cache.size)
+
+        return data
+
+    @callback
+    def _async_endpoint_failed(self, endpoint) -> None:
+        """The network statistics come with the info, a failed info refresh is a failed network refresh."""
+        if endpoint == ENDPOINT_INFO:
+            self.network.async_set_source_failed(self)
+
+
+class AppleJuiceNetworkCoordinator(DataUpdateCoordinator):
+    """Holds the statistics of the whole network for all config entries.
+
+    Every server reports the same network statistics in its /info.xml, so they are taken from
+    the info refresh of whichever entry succeeded last and cost no request of their own. They
+    only become unavailable once the last info refresh of every entry failed.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Init."""
+        self.sources = {}
+        self.source = None
+        self.failed_sources = set()
+        self.stale = False
+        self.changed_keys = None
+        self.entity_owner = None
+        self._entity_owners = {}
+        self.statistics = None
+        self.store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{DATA_NETWORK}")
+        self._statistics_pending = False
+        self.hass = hass
+        self.name = "appleJuice Network"
 
-    parsedData['serverstatus_ok'] = ">ok<" in statusData
+        super().__init__(hass, _LOGGER, name=self.name, update_interval=None, always_update=False)
 
-    sended_sources = re.compile(r'sended sources: (\d+)').search(statusData)
-    parsedData['sended_sources'] = int(sended_sources.group(1)) if sended_sources else None
+        # shared by all entries, not tied to the one being set up when it is created
+        self.config_entry = None
+        self.data = {}
 
-    sended_local_sources = re.compile(r'sended local sources: (\d+)').search(statusData)
-    parsedData['sended_local_sources'] = int(sended_local_sources.group(1)) if sended_local_sources else None
+    async def _async_update_data(self):
+        """Nothing to fetch, the data is set by the info refresh of the entries."""
+        return self.data
+
+    @callback
+    def async_set_source_data(self, coordinator, data: dict) -> None:
+        """Take the network statistics from the info refresh of an entry."""
+        if not any(value is not None for value in data.values()):
+            self.async_set_source_failed(coordinator)
+            return
+
+        self.failed_sources.discard(coordinator.schedule_id)
+        if coordinator.schedule_id != self.source:
+            _LOGGER.debug("%s taken from %s", self.name, coordinator.name)
+            self.source = coordinator.schedule_id
+
+        if self.statistics is not None:
+            _async_add_statistics(self.hass, self.statistics, data)
+            if not self._statistics_pending:
+                self._statistics_pending = True
+                self.store.async_delay_save(self.statistics_snapshot, SNAPSHOT_SAVE_DELAY)
+
+        # every entry reports the same values, only a change is passed on to the entities
+        if data != self.data or not self.last_update_success:
+            self.async_set_updated_data(data)
+
+    @callback
+    def async_set_source_failed(self, coordinator) -> None:
+        """Note a failed info refresh of an entry, the statistics are unavailable once every entry failed."""
+        self.failed_sources.add(coordinator.schedule_id)
+        if self.source == coordinator.schedule_id:
+            self.source = None
+        if self.last_update_success and self.failed_sources >= self.sources.keys():
+            self.async_set_update_error(
+                UpdateFailed(f"Error fetching {ENDPOINT_INFO} from {len(self.sources)} servers")
+            )
+
+    @callback
+    def statistics_snapshot(self) -> dict:
+        """Running statistics hour to save, called by the store once the save delay has passed."""
+        self._statistics_pending = False
+        return {"saved_at": time.time(), "statistics": self.statistics.as_dict()}
+
+    async def async_add_source(self, coordinator) -> None:
+        """Take the network statistics from an entry."""
+        self.sources[coordinator.schedule_id] = coordinator
+        # imported as soon as one entry imports its own statistics
+        if coordinator.statistics is not None and self.statistics is None:
+            self.statistics = HourlyStatistics(STATISTICS_NETWORK, DATA_NETWORK, self.name)
+            saved = await self.store.async_load()
+            _async_restore_statistics(self.hass, self.statistics, (saved or {}).get("statistics"))
+
+    @callback
+    def async_remove_source(self, coordinator) -> None:
+        """Stop taking the network statistics from an entry that is unloaded."""
+        self.sources.pop(coordinator.schedule_id, None)
+        self.failed_sources.discard(coordinator.schedule_id)
+        if self.source == coordinator.schedule_id:
+            self.source = None
+
+    @callback
+    def async_offer_entity_owner(self, entry_id: str, add_entities: Callable[[], None]) -> Callable[[], None]:
+        """Offer the sensor platform of an entry to hold the network entities, one entry holds them at a time.
+
+        Returns a callback withdrawing the offer, when the entry holding the entities withdraws,
+        they are added to the platform of another entry.
+        """
+        self._entity_owners[entry_id] = add_entities
+        if self.entity_owner is None:
+            self._async_elect_entity_owner()
+
+        @callback
+        def withdraw() -> None:
+            self._entity_owners.pop(entry_id, None)
+            if self.entity_owner == entry_id:
+                self.entity_owner = None
+                self._async_elect_entity_owner()
+
+        return withdraw
+
+    @callback
+    def _async_elect_entity_owner(self) -> None:
+        if not self._entity_owners:
+            return
+        self.entity_owner, add_entities = next(iter(self._entity_owners.items()))
+        add_entities()
 
-    sended_searchmessages = re.compile(r'sended searchmessages: (\d+)').search(statusData)
-    parsedData['sended_searchmessages'] = int(sended_searchmessages.group(1)) if sended_searchmessages else None
 
-    sended_firewallmessages = re.compile(r'sended firewallmessages: (\d+)').search(statusData)
-    parsedData['sended_firewallmessages'] = int(sended_firewallmessages.group(1)) if sended_firewallmessages else None
+async def _async_update_info(self):
+    """Fetch XML data asynchronously, the network statistics in it go to the network coordinator."""
+    infoData = await self.client.get_parsed_data(ENDPOINT_INFO, self.endpoint_caches[ENDPOINT_INFO],
+                                                 parse_info,
+                                                 incremental=InfoParser if self.stream_parsing else None,
+                                                 timeouts=self.endpoint_timeouts[ENDPOINT_INFO],
+                                                 hedge_after=self.hedge_after(ENDPOINT_INFO))
 
-    sended_messages = re.compile(r'sended messages: (\d+)').search(statusData)
-    parsedData['sended_messages'] = int(sended_messages.group(1)) if sended_messages else None
+    if infoData is None:
+        raise UpdateFailed(f"No data received from {ENDPOINT_INFO}")
 
-    messagesize = re.compile(r'messagesize: (\d+)').search(statusData)
-    parsedData['messagesize'] = int(messagesize.group(1)) if messagesize else None
+    self.network.async_set_source_data(self, {key: infoData[key] for key in NETWORK_INFO_FIELDS})
+    return {key: infoData[key] for key in SERVER_INFO_FIELDS}
 
-    responded_i_asks = re.compile(r'responded i-asks: (\d+)').search(statusData)
-    parsedData['responded_i_asks'] = int(responded_i_asks.group(1)) if responded_i_asks else None
 
-    searches = re.compile(r'searches: (\d+)').search(statusData)
-    parsedData['searches'] = int(searches.group(1)) if searches else None
+async def _async_update_status(self):
+    """Fetch XML share data asynchronously."""
+    statusData = await self.client.get_parsed_data(ENDPOINT_STATUS, self.endpoint_caches[ENDPOINT_STATUS], parse_status,
+                                                   incremental=StatusParser if self.stream_parsing else None,
+                                                   timeouts=self.endpoint_timeouts[ENDPOINT_STATUS],
+                                                   hedge_after=self.hedge_after(ENDPOINT_STATUS))
 
-    open_sockettasks = re.compile(r'open sockettasks: (\d+)').search(statusData)
-    parsedData['open_sockettasks'] = int(open_sockettasks.group(1)) if open_sockettasks else None
+    if statusData is None:
+        raise UpdateFailed(f"No data received from {ENDPOINT_STATUS}")
 
-    return parsedData
+    return statusData
@@ -0,0 +1,37 @@
+"""Adaptive polling interval for the appleJuice Server status page."""
+
+ADAPTIVE_METRICS = ("open_connections", "upspeed_last_10_sec")
+
+# relative change between two polls that counts as "moving quickly"
+ADAPTIVE_THRESHOLD = 0.1
+ADAPTIVE_SPEEDUP = 0.5
+ADAPTIVE_SLOWDOWN = 1.25
+
+
+class AdaptiveInterval:
+    """Shortens the interval while key metrics move quickly and lengthens it while they stay flat."""
+
+    def __init__(self, minimum: float, maximum: float, initial: float, metrics: tuple[str, ...] = ADAPTIVE_METRICS):
+        """Init."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = min(max(initial, minimum), maximum)
+        self._metrics = metrics
+        self._previous = {}
+
+    def update(self, data: dict) -> float:
+        """Feed a new sample and return the interval to use until the next one."""
+        change = 0.0
+        for metric in self._metrics:
+            value = data.get(metric)
+            previous = self._previous.get(metric)
+            if value is not None and previous is not None:
+                change = max(change, abs(value - previous) / max(abs(previous), 1))
+            self._previous[metric] = value
+
+        if change >= ADAPTIVE_THRESHOLD:
+            self.interval = max(self.minimum, self.interval * ADAPTIVE_SPEEDUP)
+        else:
+            self.interval = min(self.maximum, self.interval * ADAPTIVE_SLOWDOWN)
+
+        return self.interval
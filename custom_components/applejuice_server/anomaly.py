@@ -0,0 +1,99 @@
+"""Streaming anomaly detection on the transfer speeds and connections of a server."""
+
+import math
+
+ANOMALY_METRICS = (
+    "upspeed_last_10_sec",
+    "downspeed_last_10_sec",
+    "open_connections",
+    "open_sockettasks",
+)
+
+# weight of a new sample, the model follows roughly the last 1 / alpha polls
+ANOMALY_ALPHA = 0.05
+# distance from the mean, in standard deviations, that counts as anomaly
+ANOMALY_THRESHOLD = 3.0
+# samples before a metric is judged at all
+ANOMALY_WARMUP = 20
+# smallest standard deviation a sample is judged against, absolute in the unit of the metric and relative to
+# its mean, the variance of a metric that stays flat decays towards zero and a step of 1 would be an anomaly
+ANOMALY_MIN_STDDEV = 1.0
+ANOMALY_MIN_RELATIVE_STDDEV = 0.05
+
+
+class EwmaModel:
+    """Exponentially weighted mean and variance of one metric, updated in O(1) per sample."""
+
+    __slots__ = ("mean", "variance", "count")
+
+    def __init__(self, mean: float = 0.0, variance: float = 0.0, count: int = 0):
+        """Init."""
+        self.mean = mean
+        self.variance = variance
+        self.count = count
+
+    def update(self, value: float, alpha: float, min_stddev: float = ANOMALY_MIN_STDDEV,
+               min_relative_stddev: float = ANOMALY_MIN_RELATIVE_STDDEV) -> float | None:
+        """Add a sample, return its z-score against the model before it, None for the first sample.
+
+        The standard deviation is at least `min_stddev`, and at least `min_relative_stddev` of the mean.
+        """
+        if self.count == 0:
+            self.mean = value
+            self.count = 1
+            return None
+
+        diff = value - self.mean
+        stddev = max(math.sqrt(max(self.variance, 0.0)), min_stddev, min_relative_stddev * abs(self.mean))
+        z_score = diff / stddev if stddev > 0 else None
+
+        increment = alpha * diff
+        self.mean += increment
+        self.variance = (1 - alpha) * (self.variance + diff * increment)
+        self.count += 1
+        return z_score
+
+
+class AnomalyDetector:
+    """Flags samples that lie more than `threshold` standard deviations from their metric's mean.
+
+    Anomalies are still learned, so a lasting change of level stops being flagged after a while.
+    """
+
+    def __init__(self, metrics: tuple[str, ...] = ANOMALY_METRICS, alpha: float = ANOMALY_ALPHA,
+                 threshold: float = ANOMALY_THRESHOLD, warmup: int = ANOMALY_WARMUP,
+                 min_stddev: float = ANOMALY_MIN_STDDEV, min_relative_stddev: float = ANOMALY_MIN_RELATIVE_STDDEV):
+        """Init."""
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_stddev = min_stddev
+        self.min_relative_stddev = min_relative_stddev
+        self.models = {metric: EwmaModel() for metric in metrics}
+        self.z_scores = {}
+
+    def update(self, data: dict) -> dict:
+        """Learn the metrics in `data`, return a `<metric>_anomaly` flag for every metric past its warmup."""
+        flags = {}
+        for metric, model in self.models.items():
+            value = data.get(metric)
+            if value is None:
+                continue
+            z_score = model.update(value, self.alpha, self.min_stddev, self.min_relative_stddev)
+            self.z_scores[metric] = z_score
+            if model.count > self.warmup:
+                flags[f"{metric}_anomaly"] = z_score is not None and abs(z_score) >= self.threshold
+        return flags
+
+    def as_dict(self) -> dict:
+        """Model state to save."""
+        return {
+            metric: {"mean": model.mean, "variance": model.variance, "count": model.count}
+            for metric, model in self.models.items()
+        }
+
+    def restore(self, saved: dict | None) -> None:
+        """Continue from a saved model state, unknown metrics are ignored."""
+        for metric, state in (saved or {}).items():
+            if metric in self.models:
+                self.models[metric] = EwmaModel(state["mean"], state["variance"], state["count"])
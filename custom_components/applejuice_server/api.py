@@ -1,32 +1,352 @@
 """appleJuice Server."""
 
 import asyncio
+import codecs
+import copy
+import hashlib
 import logging
+import time
 import aiohttp
-from homeassistant.core import HomeAssistant
+from aiohttp import hdrs
+from collections.abc import Callable
+from homeassistant.core import HomeAssistant, callback
+from http import HTTPStatus
 from typing import Optional
 from homeassistant.helpers import aiohttp_client
+from homeassistant.util.ssl import get_default_context
+
+from .breaker import STATE_HALF_OPEN, CircuitBreaker, CircuitOpenError
+from .coalescer import RequestCoalescer
+from .const import DOMAIN, DATA_COALESCER, ENDPOINT_INFO, TIMEOUT, DEFAULT_MAX_RESPONSE_SIZE
+
+# both endpoints may be fetched at the same time, each with a hedged request
+CONNECTION_LIMIT = 4
+KEEPALIVE_TIMEOUT = 60
+CHUNK_SIZE = 4096
+# the pages are plain ASCII, used when the server sends no charset
+DEFAULT_ENCODING = "utf-8"
+# the probe of an unreachable server only has to connect and get an answer
+PROBE_TIMEOUT = 5
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def get_raw_data(hass: HomeAssistant, url: str, port: int, username: str, password: str, tls: bool, endpoint: str):
+class EndpointCache:
+    """Conditional request validators and the last parse result of one endpoint."""
+
+    def __init__(self):
+        """Init."""
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.parsed = None
+        # cost of the last successful request
+        self.network_time = None
+        self.parse_time = None
+        self.size = None
+
+    @property
+    def headers(self) -> dict:
+        """Headers for a conditional request, only sent once there is a result to fall back to."""
+        headers = {}
+        if self.parsed is not None:
+            if self.etag is not None:
+                headers[hdrs.IF_NONE_MATCH] = self.etag
+            if self.last_modified is not None:
+                headers[hdrs.IF_MODIFIED_SINCE] = self.last_modified
+        return headers
+
+    def parse(self, body: bytes, encoding: str, parser: Callable[[str], dict]) -> dict:
+        """Parse the body, or return the last result if the body is unchanged."""
+        start = time.monotonic()
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest != self.digest or self.parsed is None:
+            self.parsed = parser(body.decode(encoding, errors="replace"))
+            self.digest = digest
+        self.parse_time = time.monotonic() - start
+        return self.parsed
+
+
+class ResponseTooLarge(aiohttp.ClientPayloadError):
+    """The response body is larger than allowed."""
+
+
+def _encoding(response: aiohttp.ClientResponse) -> str:
+    """Charset from the Content-Type header, without guessing from the body."""
+    try:
+        return codecs.lookup(response.charset).name if response.charset else DEFAULT_ENCODING
+    except LookupError:
+        return DEFAULT_ENCODING
+
+
+def _check_size(size: int, max_size: int) -> None:
+    if size > max_size:
+        raise ResponseTooLarge(f"response larger than {max_size} bytes")
+
+
+async def _read_bounded(response: aiohttp.ClientResponse, max_size: int) -> bytes:
+    """Read the body chunk by chunk, giving up once it gets larger than max_size bytes."""
+    if response.content_length is not None:
+        _check_size(response.content_length, max_size)
+
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        size += len(chunk)
+        _check_size(size, max_size)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _feed_parser(response: aiohttp.ClientResponse, parser, max_size: int) -> tuple[dict, int, float]:
+    """Feed the body chunk by chunk into an incremental parser and stop reading once it has every field.
+
+    Returns the parsed data, the number of bytes read and the time spent parsing.
+    """
+    decoder = codecs.getincrementaldecoder(_encoding(response))(errors="replace")
+    size = 0
+    parse_time = 0.0
+
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        size += len(chunk)
+        _check_size(size, max_size)
+        start = time.monotonic()
+        complete = parser.feed(decoder.decode(chunk))
+        parse_time += time.monotonic() - start
+        if complete:
+            break
+
+    start = time.monotonic()
+    data = parser.close()
+    return data, size, parse_time + time.monotonic() - start
+
+
+@callback
+def async_get_coalescer(hass: HomeAssistant) -> RequestCoalescer:
+    """The request coalescer shared by the config flow and all entries."""
+    return hass.data.setdefault(DOMAIN, {}).setdefault(DATA_COALESCER, RequestCoalescer())
+
+
+def _build_url(url: str, port: int, tls: bool, endpoint: str) -> str:
+    protocol = "https" if tls else "http"
+    return f"{protocol}://{url}:{port}{endpoint}"
+
+
+async def get_raw_data(hass: HomeAssistant, url: str, port: int, username: str, password: str, tls: bool, endpoint: str,
+                       timeout: int = TIMEOUT, max_size: int = DEFAULT_MAX_RESPONSE_SIZE):
     """Fetch RAW data asynchronously using aiohttp."""
 
     session = aiohttp_client.async_get_clientsession(hass)
+    auth = aiohttp.BasicAuth(username, password)
+    full_url = _build_url(url, port, tls, endpoint)
 
-    try:
-        protocol = "https" if tls else "http"
-        full_url = f"{protocol}://{url}:{port}{endpoint}"
+    async def fetch():
+        try:
+            _LOGGER.debug("call url: %s", full_url)
+
+            async with asyncio.timeout(timeout):
+                async with session.get(full_url, auth=auth) as response:
+                    response.raise_for_status()
+                    body = await _read_bounded(response, max_size)
+                    return body.decode(_encoding(response), errors="replace")
+
+        except aiohttp.ClientError as e:
+            _LOGGER.error("Error while fetching RAW data: %s", e)
+
+        return None
 
-        _LOGGER.debug("call url: %s", full_url)
+    return await async_get_coalescer(hass).async_run(("raw", full_url, auth), fetch)
 
-        async with asyncio.timeout(10):
-            async with session.get(full_url, auth=aiohttp.BasicAuth(username, password)) as response:
+
+class AppleJuiceClient:
+    """Connection to a single appleJuice Server, kept open between polls."""
+
+    def __init__(self, url: str, port: int, username: str, password: str, tls: bool,
+                 keepalive_timeout: float = KEEPALIVE_TIMEOUT, max_size: int = DEFAULT_MAX_RESPONSE_SIZE,
+                 coalescer: RequestCoalescer | None = None):
+        """Init."""
+        self.base_url = _build_url(url, port, tls, "")
+        self.max_size = max_size
+        self.coalescer = coalescer
+        self.breaker = CircuitBreaker()
+        self.hedged = 0
+        self._auth = aiohttp.BasicAuth(username, password)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                keepalive_timeout=keepalive_timeout,
+                ssl=get_default_context() if tls else False,
+            ),
+            headers={
+                hdrs.AUTHORIZATION: self._auth.encode(),
+                hdrs.ACCEPT_ENCODING: "gzip, deflate",
+            },
+        )
+
+    async def async_close(self) -> None:
+        """Close the session and all kept-alive connections."""
+        await self._session.close()
+
+    async def get_parsed_data(self, endpoint: str, cache: EndpointCache, parser: Callable[[str], dict],
+                              timeout: int = TIMEOUT, incremental: Callable | None = None,
+                              timeouts: aiohttp.ClientTimeout | None = None, hedge_after: float | None = None):
+        """Fetch and parse data, shared with every client asking the same server for the same endpoint.
+
+        Only the client doing the fetch updates its cache with validators and timings, the others
+        take over the result and drop their validators, so their next request is unconditional. Raises CircuitOpenError while the server is unreachable.
+
+        `timeouts` limits connecting and reading separately within the overall `timeout`. With
+        `hedge_after`, a second request is sent once the first took that many seconds, the first
+        answer wins.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.base_url} is unreachable, next probe in {self.breaker.retry_in:.0f}s")
+        if self.breaker.state == STATE_HALF_OPEN:
+            await self._async_probe()
+
+        if self.coalescer is None:
+            return await self._fetch_parsed_data(endpoint, cache, parser, timeout, incremental, timeouts, hedge_after)
+
+        start = time.monotonic()
+        fetched = False
+
+        async def fetch():
+            nonlocal fetched
+            fetched = True
+            return await self._fetch_parsed_data(endpoint, cache, parser, timeout, incremental, timeouts, hedge_after)
+
+        data = await self.coalescer.async_run(("parsed", self.base_url + endpoint, self._auth, parser), fetch)
+
+        if not fetched and data is not None:
+            _LOGGER.debug("%s%s shared with another request", self.base_url, endpoint)
+            cache.parsed = data
+            # the validators describe the last body this client fetched itself, not the one behind the result
+            cache.etag = cache.last_modified = cache.digest = None
+            cache.network_time = time.monotonic() - start
+            cache.parse_time = 0.0
+            cache.size = 0
+
+        return data
+
+    async def _async_probe(self) -> None:
+        """Request the small /info.xml once, to close the breaker or keep it open for longer."""
+        self.breaker.probing = True
+        try:
+            async with asyncio.timeout(PROBE_TIMEOUT):
+                async with self._session.get(self.base_url + ENDPOINT_INFO) as response:
+                    response.raise_for_status()
+        except (aiohttp.ClientError, TimeoutError) as e:
+            self.breaker.record_failure()
+            raise CircuitOpenError(f"{self.base_url} is still unreachable: {e}") from e
+        except asyncio.CancelledError:
+            self.breaker.probing = False
+            raise
+
+        _LOGGER.info("%s is reachable again", self.base_url)
+        self.breaker.record_success()
+
+    async def _fetch_parsed_data(self, endpoint: str, cache: EndpointCache, parser: Callable[[str], dict],
+                                 timeout: int = TIMEOUT, incremental: Callable | None = None,
+                                 timeouts: aiohttp.ClientTimeout | None = None, hedge_after: float | None = None):
+        """Fetch and parse data, and count the outcome for the circuit breaker."""
+        try:
+            async with asyncio.timeout(timeout):
+                if hedge_after is None:
+                    data = await self._request_parsed_data(endpoint, cache, parser, incremental, timeouts)
+                else:
+                    data = await self._hedged_request_parsed_data(endpoint, cache, parser, incremental, timeouts,
+                                                                  hedge_after)
+        except TimeoutError:
+            self.breaker.record_failure()
+            raise
+
+        if data is None:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return data
+
+    async def _hedged_request_parsed_data(self, endpoint: str, cache: EndpointCache, parser: Callable[[str], dict],
+                                          incremental: Callable | None, timeouts: aiohttp.ClientTimeout | None,
+                                          hedge_after: float):
+        """Request the data, and once more if the first request takes longer than `hedge_after`.
+
+        Every request works on its own copy of the cache, the one of the first successful request
+        replaces it, the other request is cancelled.
+        """
+        caches = {}
+
+        def start():
+            caches_copy = copy.copy(cache)
+            task = asyncio.create_task(
+                self._request_parsed_data(endpoint, caches_copy, parser, incremental, timeouts)
+            )
+            caches[task] = caches_copy
+            return task
+
+        pending = {start()}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                _LOGGER.debug("%s%s took longer than %.3fs, hedging", self.base_url, endpoint, hedge_after)
+                self.hedged += 1
+                pending.add(start())
+
+            while True:
+                for task in done:
+                    if task.exception() is None and task.result() is not None:
+                        vars(cache).update(vars(caches[task]))
+                        return task.result()
+                if not pending:
+                    # both failed, the last one tells why
+                    return task.result()
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _request_parsed_data(self, endpoint: str, cache: EndpointCache, parser: Callable[[str], dict],
+                                   incremental: Callable | None = None, timeouts: aiohttp.ClientTimeout | None = None):
+        """Fetch and parse data, skipping the parser when the payload did not change.
+
+        With an `incremental` parser class the body is parsed while it is read, and reading stops
+        as soon as every field has been found. The connection is then closed instead of reused.
+        """
+
+        try:
+            full_url = self.base_url + endpoint
+
+            _LOGGER.debug("call url: %s", full_url)
+
+            start = time.monotonic()
+            async with self._session.get(full_url, headers=cache.headers, timeout=timeouts) as response:
                 response.raise_for_status()
-                return await response.text()
 
-    except aiohttp.ClientError as e:
-        _LOGGER.error("Error while fetching RAW data: %s", e)
+                if response.status == HTTPStatus.NOT_MODIFIED:
+                    _LOGGER.debug("%s not modified", full_url)
+                    cache.network_time = time.monotonic() - start
+                    cache.parse_time = 0.0
+                    cache.size = 0
+                    return cache.parsed
+
+                cache.etag = response.headers.get(hdrs.ETAG)
+                cache.last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+
+                if incremental is not None:
+                    cache.parsed, cache.size, cache.parse_time = await _feed_parser(
+                        response, incremental(), self.max_size
+                    )
+                    cache.digest = None
+                    cache.network_time = time.monotonic() - start - cache.parse_time
+                    return cache.parsed
+
+                body = await _read_bounded(response, self.max_size)
+                encoding = _encoding(response)
+            cache.network_time = time.monotonic() - start
+            cache.size = len(body)
+
+        except aiohttp.ClientError as e:
+            _LOGGER.error("Error while fetching RAW data: %s", e)
+            return None
 
-    return None
+        return cache.parse(body, encoding, parser)
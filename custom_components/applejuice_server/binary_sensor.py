@@ -8,6 +8,7 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 
+from .anomaly import ANOMALY_METRICS
 from .const import DOMAIN
 from .entity import BaseAppleJuiceServerEntity
 
@@ -27,6 +28,35 @@ class AppleJuiceServerBinarySensorDescription(BinarySensorEntityDescription):
     entity_category: str | None = None
 
 
+ANOMALY_NAMES = {
+    "upspeed_last_10_sec": ("Upload Speed Anomaly", "mdi:upload-network"),
+    "downspeed_last_10_sec": ("Download Speed Anomaly", "mdi:download-network"),
+    "open_connections": ("Open Connections Anomaly", "mdi:connection"),
+    "open_sockettasks": ("Open Socket Tasks Anomaly", "mdi:transit-connection-variant"),
+}
+
+BINARY_SENSORS_ANOMALY: tuple[AppleJuiceServerBinarySensorDescription, ...] = [
+    AppleJuiceServerBinarySensorDescription(
+        key=f"{metric}_anomaly",
+        sensor_name=f"{metric}_anomaly",
+        name=ANOMALY_NAMES[metric][0],
+        icon=ANOMALY_NAMES[metric][1],
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        subscriptions=[f"{metric}_anomaly"],
+    )
+    for metric in ANOMALY_METRICS
+]
+
+BINARY_SENSOR_MEMORY_PRESSURE = AppleJuiceServerBinarySensorDescription(
+    key="memory_pressure",
+    sensor_name="memory_pressure",
+    name="Memory Pressure",
+    icon="mdi:memory",
+    device_class=BinarySensorDeviceClass.PROBLEM,
+    subscriptions=["memory_pressure"],
+)
+
+
 async def async_setup_entry(hass, entry, async_add_devices):
     """Set up the binary_sensor platform."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
@@ -46,9 +76,11 @@ async def async_setup_update_binary_sensors(coordinator, entry, async_add_entiti
         subscriptions=[("serverstatus_ok")],
     )
 
-    await coordinator.async_refresh()
-
-    async_add_entities([AppleJuiceServerBinarySensor(coordinator, entry, desc)])
+    async_add_entities(
+        [AppleJuiceServerBinarySensor(coordinator, entry, desc)] +
+        [AppleJuiceServerAnomalyBinarySensor(coordinator, entry, desc) for desc in BINARY_SENSORS_ANOMALY] +
+        [AppleJuiceServerAnomalyBinarySensor(coordinator, entry, BINARY_SENSOR_MEMORY_PRESSURE)]
+    )
 
 
 class AppleJuiceServerBinarySensor(BaseAppleJuiceServerEntity, BinarySensorEntity):
@@ -61,7 +93,7 @@ class AppleJuiceServerBinarySensor(BaseAppleJuiceServerEntity, BinarySensorEntit
             description,
     ) -> None:
         """Initialize the binary_sensor class."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, description.subscriptions)
         self.entity_description = description
         self.sensor_name = description.sensor_name
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
@@ -74,3 +106,12 @@ class AppleJuiceServerBinarySensor(BaseAppleJuiceServerEntity, BinarySensorEntit
     def is_on(self) -> bool:
         """Return the state of the sensor."""
         return self._coordinator.data.get(self.entity_description.key) != True
+
+
+class AppleJuiceServerAnomalyBinarySensor(AppleJuiceServerBinarySensor):
+    """Anomaly of a metric or memory pressure, unknown until there is a value for it."""
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return the state of the sensor."""
+        return self._coordinator.data.get(self.entity_description.key)
@@ -0,0 +1,78 @@
+"""Circuit breaker keeping unreachable appleJuice Servers from being polled."""
+
+import time
+
+# consecutive failed requests until a server counts as unreachable
+BREAKER_THRESHOLD = 3
+# seconds until the first probe, doubled after every failed probe up to the maximum
+BREAKER_BACKOFF = 30
+BREAKER_MAX_BACKOFF = 900
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+BREAKER_STATES = [STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN]
+
+
+class CircuitOpenError(Exception):
+    """The server is unreachable, requests are not sent until a probe succeeds."""
+
+
+class CircuitBreaker:
+    """Tracks consecutive failures of one server.
+
+    Closed, requests are sent. Open after `threshold` consecutive failures, requests fail
+    right away. Half-open once the backoff has passed, a single probe decides whether the
+    breaker closes again or stays open with twice the backoff.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, backoff: float = BREAKER_BACKOFF,
+                 max_backoff: float = BREAKER_MAX_BACKOFF):
+        """Init."""
+        self.threshold = threshold
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.probing = False
+        self._initial_backoff = backoff
+        self._backoff = backoff
+        self._retry_at = None
+
+    @property
+    def state(self) -> str:
+        """Closed, open or half-open, the latter once a probe is due."""
+        if self._retry_at is None:
+            return STATE_CLOSED
+        if time.monotonic() < self._retry_at:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    @property
+    def retry_in(self) -> float | None:
+        """Seconds until the next probe, None while closed."""
+        if self._retry_at is None:
+            return None
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def allow(self) -> bool:
+        """Check if a request may be sent, in half-open state only the one doing the probe."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        return state == STATE_HALF_OPEN and not self.probing
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self.failures = 0
+        self.probing = False
+        self._backoff = self._initial_backoff
+        self._retry_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, open the breaker at the threshold and back off further after a failed probe."""
+        self.failures += 1
+        if self.probing:
+            self.probing = False
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+            self._retry_at = time.monotonic() + self._backoff
+        elif self._retry_at is None and self.failures >= self.threshold:
+            self._retry_at = time.monotonic() + self._backoff
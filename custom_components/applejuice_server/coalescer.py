@@ -0,0 +1,57 @@
+"""Request coalescing shared by the config flow and all appleJuice Server config entries."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+
+# long enough for entries polling the same server in the same cycle, short enough to never serve old data
+COALESCE_TTL = 2.0
+
+
+class RequestCoalescer:
+    """Shares one fetch between all callers asking for the same thing at the same time.
+
+    A successful result is kept for `ttl` seconds and handed to later callers as well. A failed
+    fetch (None) is shared with the callers already waiting for it, but never kept.
+    """
+
+    def __init__(self, ttl: float = COALESCE_TTL):
+        """Init."""
+        self.ttl = ttl
+        self.shared = 0
+        self._inflight = {}
+        self._results = {}
+
+    @property
+    def inflight(self) -> int:
+        """Number of fetches running right now."""
+        return len(self._inflight)
+
+    async def async_run(self, key: Hashable, fetch: Callable[[], Awaitable]):
+        """Return the result of `fetch()`, or of the running or recent fetch with the same key."""
+        result = self._results.get(key)
+        if result is not None:
+            if result[0] > time.monotonic():
+                self.shared += 1
+                return result[1]
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            # in its own task, a caller that is cancelled does not cancel the fetch for the others
+            task = self._inflight[key] = asyncio.get_running_loop().create_task(fetch())
+            task.add_done_callback(lambda task: self._done(key, task))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or task.result() is None:
+            return
+
+        now = time.monotonic()
+        self._results = {key: result for key, result in self._results.items() if result[0] > now}
+        if self.ttl:
+            self._results[key] = (now + self.ttl, task.result())
@@ -5,6 +5,8 @@ from logging import Logger
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.components import webhook
+from homeassistant.const import CONF_WEBHOOK_ID
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.util import network, slugify
@@ -18,7 +20,28 @@ from .const import (
     CONF_PASSWORD,
     CONF_TLS,
     CONF_OPTION_POLLING_RATE,
+    CONF_OPTION_INFO_POLLING_RATE,
+    CONF_OPTION_ADAPTIVE_POLLING,
+    CONF_OPTION_POLLING_RATE_MIN,
+    CONF_OPTION_POLLING_RATE_MAX,
+    CONF_OPTION_PUSH_MODE,
+    CONF_OPTION_MAX_RESPONSE_SIZE,
+    CONF_OPTION_STREAM_PARSING,
+    CONF_OPTION_STATISTICS_IMPORT,
+    CONF_OPTION_CONNECT_TIMEOUT,
+    CONF_OPTION_READ_TIMEOUT,
+    CONF_OPTION_INFO_CONNECT_TIMEOUT,
+    CONF_OPTION_INFO_READ_TIMEOUT,
+    CONF_OPTION_HEDGED_REQUESTS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    TIMEOUT,
+    DEFAULT_POLLING_RATE,
+    DEFAULT_POLLING_RATE_MIN,
+    DEFAULT_POLLING_RATE_MAX,
+    DEFAULT_MAX_RESPONSE_SIZE,
     DOMAIN,
+    ENDPOINT_INFO,
 )
 
 CONF_UPDATE_INTERVAL = "update_interval"
@@ -96,7 +119,7 @@ class AppleJuiceConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def _test_connection(self, host, port, username, password, tls):
         """Validate the connection by requesting /xml/information.xml."""
 
-        xml_data = await get_raw_data(self.hass, host, port, username, password, tls, "/info.xml")
+        xml_data = await get_raw_data(self.hass, host, port, username, password, tls, ENDPOINT_INFO)
 
         if xml_data is None:
             return False
@@ -124,8 +147,20 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        errors = {}
+
+        # generated once and kept, so the server side does not have to be reconfigured
+        webhook_id = self.config_entry.options.get(CONF_WEBHOOK_ID) or webhook.async_generate_id()
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if user_input[CONF_OPTION_POLLING_RATE_MIN] > user_input[CONF_OPTION_POLLING_RATE_MAX]:
+                errors[CONF_OPTION_POLLING_RATE_MIN] = "polling_rate_bounds"
+            else:
+                return self.async_create_entry(title="", data={**user_input, CONF_WEBHOOK_ID: webhook_id})
+
+        polling_rate = self.config_entry.options.get(CONF_OPTION_POLLING_RATE, DEFAULT_POLLING_RATE)
+        connect_timeout = self.config_entry.options.get(CONF_OPTION_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)
+        read_timeout = self.config_entry.options.get(CONF_OPTION_READ_TIMEOUT, DEFAULT_READ_TIMEOUT)
 
         return self.async_show_form(
             step_id="init",
@@ -133,10 +168,84 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 {
                     vol.Optional(
                         CONF_OPTION_POLLING_RATE,
+                        default=polling_rate,
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_OPTION_INFO_POLLING_RATE,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_INFO_POLLING_RATE, polling_rate
+                        ),
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_OPTION_ADAPTIVE_POLLING,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_ADAPTIVE_POLLING, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_OPTION_POLLING_RATE_MIN,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_POLLING_RATE_MIN, DEFAULT_POLLING_RATE_MIN
+                        ),
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_OPTION_POLLING_RATE_MAX,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_POLLING_RATE_MAX, DEFAULT_POLLING_RATE_MAX
+                        ),
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_OPTION_PUSH_MODE,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_PUSH_MODE, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_OPTION_MAX_RESPONSE_SIZE,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_MAX_RESPONSE_SIZE, DEFAULT_MAX_RESPONSE_SIZE // 1024
+                        ),
+                    ): vol.All(int, vol.Range(min=16)),
+                    vol.Optional(
+                        CONF_OPTION_STREAM_PARSING,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_STREAM_PARSING, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_OPTION_STATISTICS_IMPORT,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_STATISTICS_IMPORT, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_OPTION_CONNECT_TIMEOUT,
+                        default=connect_timeout,
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=TIMEOUT)),
+                    vol.Optional(
+                        CONF_OPTION_READ_TIMEOUT,
+                        default=read_timeout,
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=TIMEOUT)),
+                    vol.Optional(
+                        CONF_OPTION_INFO_CONNECT_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_INFO_CONNECT_TIMEOUT, connect_timeout
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=TIMEOUT)),
+                    vol.Optional(
+                        CONF_OPTION_INFO_READ_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_OPTION_INFO_READ_TIMEOUT, read_timeout
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=TIMEOUT)),
+                    vol.Optional(
+                        CONF_OPTION_HEDGED_REQUESTS,
                         default=self.config_entry.options.get(
-                            CONF_OPTION_POLLING_RATE, 30
+                            CONF_OPTION_HEDGED_REQUESTS, False
                         ),
-                    ): int,
+                    ): bool,
                 }
             ),
+            description_placeholders={"webhook_path": webhook.async_generate_path(webhook_id)},
+            errors=errors,
         )
@@ -13,5 +13,56 @@ CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_TLS = "tls"
 CONF_OPTION_POLLING_RATE = "polling_rate"
+CONF_OPTION_INFO_POLLING_RATE = "info_polling_rate"
+CONF_OPTION_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_OPTION_POLLING_RATE_MIN = "polling_rate_min"
+CONF_OPTION_POLLING_RATE_MAX = "polling_rate_max"
+CONF_OPTION_PUSH_MODE = "push_mode"
+CONF_OPTION_MAX_RESPONSE_SIZE = "max_response_size"
+CONF_OPTION_STREAM_PARSING = "stream_parsing"
+CONF_OPTION_STATISTICS_IMPORT = "statistics_import"
+CONF_OPTION_CONNECT_TIMEOUT = "connect_timeout"
+CONF_OPTION_READ_TIMEOUT = "read_timeout"
+CONF_OPTION_INFO_CONNECT_TIMEOUT = "info_connect_timeout"
+CONF_OPTION_INFO_READ_TIMEOUT = "info_read_timeout"
+CONF_OPTION_HEDGED_REQUESTS = "hedged_requests"
+
+DEFAULT_POLLING_RATE = 30
+DEFAULT_POLLING_RATE_MIN = 10
+DEFAULT_POLLING_RATE_MAX = 300
+# status page polling rate in push mode, only to notice a server that stopped pushing
+LIVENESS_POLLING_RATE = 300
+
+MAX_PUSH_SIZE = 256 * 1024
+
+# bytes, the option is in KiB
+DEFAULT_MAX_RESPONSE_SIZE = 1024 * 1024
+
+ENDPOINT_INFO = "/info.xml"
+ENDPOINT_STATUS = "/status_raw.htm"
 
 TIMEOUT = 10
+DEFAULT_CONNECT_TIMEOUT = 3
+DEFAULT_READ_TIMEOUT = 5
+
+# a second request is sent once the first one took longer than this percentile of the recent ones
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+
+DATA_SCHEDULER = "scheduler"
+DATA_COALESCER = "coalescer"
+DATA_NETWORK = "network"
+
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+ATTR_STALE = "stale"
+
+HISTORY_ATTRIBUTE_WINDOW = 3600
+
+SERVICE_HISTORY_STATS = "history_stats"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_METRIC = "metric"
+ATTR_WINDOW = "window"
+ATTR_PERCENTILES = "percentiles"
+MAX_CONCURRENT_REQUESTS = 8
@@ -0,0 +1,72 @@
+"""Diagnostics support for appleJuice Server."""
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_USERNAME, CONF_PASSWORD
+
+# anyone who knows the webhook id can push a status
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, CONF_WEBHOOK_ID}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "last_update_success": coordinator.last_update_success,
+        "setup_time": coordinator.setup_time,
+        "endpoints": {
+            endpoint: {
+                "interval": coordinator.endpoint_intervals[endpoint].total_seconds(),
+                "latency": coordinator.endpoint_latency.get(endpoint),
+                "response_sizes": list(coordinator.response_sizes[endpoint]),
+                "connect_timeout": coordinator.endpoint_timeouts[endpoint].sock_connect,
+                "read_timeout": coordinator.endpoint_timeouts[endpoint].sock_read,
+                "hedge_after": coordinator.hedge_after(endpoint),
+            }
+            for endpoint in coordinator.updaters
+        },
+        "timings": {
+            phase: coordinator.timings.percentiles(phase, (50, 95, 99))
+            for phase in coordinator.timings.phases
+        },
+        "scheduler": {
+            "queue_depth": coordinator.scheduler.queue_depth,
+            "lag": coordinator.scheduler.lag,
+            "max_lag": coordinator.scheduler.max_lag,
+        },
+        "anomaly": {
+            metric: {**state, "z_score": coordinator.anomaly.z_scores.get(metric)}
+            for metric, state in coordinator.anomaly.as_dict().items()
+        },
+        "memory_forecast": {
+            "samples": coordinator.memory_forecast.fit.count,
+            "slope": coordinator.memory_forecast.fit.slope(),
+        },
+        "breaker": {
+            "state": coordinator.client.breaker.state,
+            "failures": coordinator.client.breaker.failures,
+            "retry_in": coordinator.client.breaker.retry_in,
+        },
+        "hedged": coordinator.client.hedged,
+        "coalescer": {
+            "shared": coordinator.client.coalescer.shared,
+            "inflight": coordinator.client.coalescer.inflight,
+        },
+        "network": {
+            "source": coordinator.network.source,
+            "sources": len(coordinator.network.sources),
+            "failed_sources": len(coordinator.network.failed_sources),
+            "last_update_success": coordinator.network.last_update_success,
+            "entity_owner": coordinator.network.entity_owner,
+            "data": coordinator.network.data,
+        },
+        "data": coordinator.data,
+    }
@@ -5,20 +5,32 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceEntryType
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_NETWORK, ATTR_STALE
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def stale_attributes(coordinator) -> dict | None:
+    """Mark values restored from the last snapshot until the first successful refresh."""
+    return {ATTR_STALE: True} if coordinator.stale else None
+
+
 class BaseAppleJuiceServerEntity(CoordinatorEntity):
     """Base class entity for appleJuice Server."""
 
-    def __init__(self, coordinator, config_entry):
+    _unrecorded_attributes = frozenset({ATTR_STALE})
+
+    def __init__(self, coordinator, config_entry, subscriptions=None):
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset(subscriptions) if subscriptions is not None else None)
         self.config_entry = config_entry
         self._name = coordinator.name
 
+    @property
+    def extra_state_attributes(self):
+        """Stale mark of restored values."""
+        return stale_attributes(self.coordinator)
+
     @property
     def device_info(self):
         """Entity device info."""
@@ -32,18 +44,25 @@ class BaseAppleJuiceServerEntity(CoordinatorEntity):
 
 
 class BaseAppleJuiceNetworkEntity(CoordinatorEntity):
-    """Base class entity for appleJuice Network."""
+    """Base class entity for appleJuice Network, shared by all entries and held by one of them."""
+
+    _unrecorded_attributes = frozenset({ATTR_STALE})
 
-    def __init__(self, coordinator, config_entry):
+    def __init__(self, coordinator, config_entry, subscriptions=None):
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset(subscriptions) if subscriptions is not None else None)
         self.config_entry = config_entry
 
+    @property
+    def extra_state_attributes(self):
+        """Stale mark of restored values."""
+        return stale_attributes(self.coordinator)
+
     @property
     def device_info(self):
         """Entity device info."""
         return DeviceInfo(
-            identifiers={(DOMAIN, self.config_entry.entry_id, "network")},
+            identifiers={(DOMAIN, DATA_NETWORK)},
             name="appleJuice Network",
             model="appleJuice Network",
             manufacturer="appleJuiceNETZ",
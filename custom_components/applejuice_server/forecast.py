@@ -0,0 +1,104 @@
+"""Forecast of when a server runs out of memory, from the trend of its memory usage."""
+
+from collections import deque
+
+# samples the trend is fitted over, half an hour at the default polling rate
+FORECAST_WINDOW = 60
+FORECAST_MIN_SAMPLES = 10
+# under pressure when the maximum is reached within the horizon, or the usage is already close to it
+MEMORY_PRESSURE_HORIZON = 3600
+MEMORY_PRESSURE_RATIO = 0.9
+
+
+class RollingLinearFit:
+    """Least-squares line through the last `window` points.
+
+    The sums are updated in O(1) per point. The x values are taken relative to an origin that
+    is moved to the oldest point once per window, so the sums never lose precision.
+    """
+
+    def __init__(self, window: int = FORECAST_WINDOW):
+        """Init."""
+        self._points = deque(maxlen=window)
+        self._origin = None
+        self._added = 0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of points in the window."""
+        return len(self._points)
+
+    def add(self, x: float, y: float) -> None:
+        """Add a point, the oldest one drops out once the window is full."""
+        if self._origin is None or self._added >= self._points.maxlen:
+            self._rebase(x if not self._points else self._points[0][0])
+
+        if len(self._points) == self._points.maxlen:
+            self._accumulate(*self._points[0], -1)
+        self._points.append((x, y))
+        self._accumulate(x, y, 1)
+        self._added += 1
+
+    def slope(self) -> float | None:
+        """Slope of the fitted line, None without a spread in x."""
+        n = len(self._points)
+        denominator = n * self._sxx - self._sx * self._sx
+        if n < 2 or denominator <= 0:
+            return None
+        return (n * self._sxy - self._sx * self._sy) / denominator
+
+    def value_at(self, x: float) -> float | None:
+        """Value of the fitted line at `x`."""
+        slope = self.slope()
+        if slope is None:
+            return None
+        n = len(self._points)
+        intercept = (self._sy - slope * self._sx) / n
+        return intercept + slope * (x - self._origin)
+
+    def _accumulate(self, x: float, y: float, sign: int) -> None:
+        x -= self._origin
+        self._sx += sign * x
+        self._sy += sign * y
+        self._sxx += sign * x * x
+        self._sxy += sign * x * y
+
+    def _rebase(self, origin: float) -> None:
+        self._origin = origin
+        self._added = 0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        for x, y in self._points:
+            self._accumulate(x, y, 1)
+
+
+class MemoryForecast:
+    """Fits the memory usage of a server and forecasts when it reaches its maximum."""
+
+    def __init__(self, window: int = FORECAST_WINDOW):
+        """Init."""
+        self.fit = RollingLinearFit(window)
+
+    def update(self, data: dict, timestamp: float) -> dict:
+        """Add the memory usage in `data`, return the forecast.
+
+        `memory_time_to_max` is None while the usage does not grow, or before enough samples.
+        """
+        used = data.get("memory_used")
+        maximum = data.get("memory_max")
+        if used is None or not maximum:
+            return {}
+
+        self.fit.add(timestamp, used)
+
+        growth = self.fit.slope() if self.fit.count >= FORECAST_MIN_SAMPLES else None
+        time_to_max = None
+        if growth is not None and growth > 0:
+            time_to_max = max(0.0, (maximum - self.fit.value_at(timestamp)) / growth)
+
+        return {
+            "memory_growth_rate": growth,
+            "memory_time_to_max": time_to_max,
+            "memory_pressure": used >= maximum * MEMORY_PRESSURE_RATIO
+            or (time_to_max is not None and time_to_max <= MEMORY_PRESSURE_HORIZON),
+        }
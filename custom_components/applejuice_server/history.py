@@ -0,0 +1,118 @@
+"""Fixed-size history of the polled metrics, kept in a memory-mapped file."""
+
+import logging
+import math
+import mmap
+import os
+import struct
+import zlib
+
+from .parser import SERVER_INFO_FIELDS, STATUS_FIELDS
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_METRICS: tuple[str, ...] = tuple(SERVER_INFO_FIELDS) + tuple(field.key for field in STATUS_FIELDS)
+
+# one day at the default polling rate
+DEFAULT_HISTORY_CAPACITY = 2880
+
+_MAGIC = b"AJHIST01"
+# magic, crc32 of the metric names, capacity, index of the next row, number of rows
+_HEADER = struct.Struct("<8sIIII")
+
+
+def percentile(values: list, percent: float):
+    """Linear interpolated percentile of sorted values."""
+    if not values:
+        return None
+    position = (len(values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class MetricHistory:
+    """Ring buffer with one float64 column per metric and a timestamp per row.
+
+    The buffer lives in a memory-mapped file, so it survives restarts and its size never
+    changes, no matter how long the integration runs. Missing values are stored as NaN.
+    Opening, flushing and closing do file I/O and belong in the executor.
+    """
+
+    def __init__(self, path: str, metrics: tuple[str, ...] = HISTORY_METRICS,
+                 capacity: int = DEFAULT_HISTORY_CAPACITY):
+        """Open the file at `path`, a file with another layout is started over."""
+        self.metrics = metrics
+        self.capacity = capacity
+        self._columns = {metric: column for column, metric in enumerate(metrics, start=1)}
+        self._row = struct.Struct(f"<{len(metrics) + 1}d")
+        self._layout = zlib.crc32(",".join(metrics).encode())
+
+        size = _HEADER.size + capacity * self._row.size
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        magic, layout, file_capacity, self._head, self.count = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or layout != self._layout or file_capacity != capacity or self.count > capacity:
+            _LOGGER.debug("starting new history in %s", path)
+            self._head = self.count = 0
+            self._write_header()
+
+        self._values = memoryview(self._mmap)[_HEADER.size:].cast("d")
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self._layout, self.capacity, self._head, self.count)
+
+    def append(self, timestamp: float, data: dict) -> None:
+        """Store one sample of every metric, overwriting the oldest row once the buffer is full."""
+        values = (data.get(metric) for metric in self.metrics)
+        self._row.pack_into(
+            self._mmap, _HEADER.size + self._head * self._row.size,
+            timestamp, *(math.nan if value is None else value for value in values)
+        )
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self._write_header()
+
+    def values(self, metric: str, since: float) -> list:
+        """All stored values of a metric sampled at or after `since`, oldest first."""
+        column = self._columns[metric]
+        stride = len(self.metrics) + 1
+        found = []
+
+        # walk backwards from the newest row, rows are in time order
+        for age in range(1, self.count + 1):
+            row = (self._head - age) % self.capacity * stride
+            if self._values[row] < since:
+                break
+            value = self._values[row + column]
+            if not math.isnan(value):
+                found.append(value)
+
+        found.reverse()
+        return found
+
+    def stats(self, metric: str, since: float, percentiles: tuple = (50, 95)) -> dict:
+        """Min, max, mean and percentiles of a metric sampled at or after `since`."""
+        values = self.values(metric, since)
+        ordered = sorted(values)
+        return {
+            "count": len(values),
+            "min": ordered[0] if ordered else None,
+            "max": ordered[-1] if ordered else None,
+            "mean": sum(values) / len(values) if values else None,
+            **{f"p{percent:g}": percentile(ordered, percent) for percent in percentiles},
+        }
+
+    def close(self) -> None:
+        """Write the buffer to disk and release it."""
+        self._values.release()
+        self._mmap.flush()
+        self._mmap.close()
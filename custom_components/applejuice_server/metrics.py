@@ -0,0 +1,183 @@
+"""OpenMetrics exposition of all appleJuice Servers, for Prometheus to scrape."""
+
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from aiohttp import hdrs, web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.const import CONTENT_TYPE_TEXT_PLAIN
+
+from .const import DOMAIN, DATA_NETWORK, CONF_URL, CONF_PORT
+
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+CONTENT_TYPE_OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+@dataclass(frozen=True)
+class MetricFamily:
+    """A coordinator value exposed as metric family."""
+
+    key: str
+    name: str
+    help: str
+    type: str = "gauge"
+    scale: float = 1
+
+
+SERVER_FAMILIES = (
+    MetricFamily("user", "applejuice_server_users", "Users connected to the server."),
+    MetricFamily("firewalled", "applejuice_server_users_firewalled", "Firewalled users connected to the server."),
+    MetricFamily("filecount", "applejuice_server_files", "Files shared by the users of the server."),
+    MetricFamily("filesize", "applejuice_server_files_bytes", "Size of the files shared by the users of the server."),
+    MetricFamily("open_connections", "applejuice_server_open_connections", "Open connections."),
+    MetricFamily("open_sockettasks", "applejuice_server_open_sockettasks", "Open socket tasks."),
+    MetricFamily("memory_used", "applejuice_server_memory_used_bytes", "Memory used.", scale=1024),
+    MetricFamily("memory_free", "applejuice_server_memory_free_bytes", "Memory free.", scale=1024),
+    MetricFamily("memory_max", "applejuice_server_memory_max_bytes", "Memory limit.", scale=1024),
+    MetricFamily("upspeed_last_10_sec", "applejuice_server_upload_bytes_per_second",
+                 "Upload speed over the last 10 seconds.", scale=1024),
+    MetricFamily("downspeed_last_10_sec", "applejuice_server_download_bytes_per_second",
+                 "Download speed over the last 10 seconds.", scale=1024),
+    MetricFamily("messagesize", "applejuice_server_messagesize", "Message size."),
+    MetricFamily("sended_sources", "applejuice_server_sended_sources", "Sources sent.", "counter"),
+    MetricFamily("sended_local_sources", "applejuice_server_sended_local_sources", "Local sources sent.", "counter"),
+    MetricFamily("sended_searchmessages", "applejuice_server_sended_searchmessages", "Search messages sent.",
+                 "counter"),
+    MetricFamily("sended_firewallmessages", "applejuice_server_sended_firewallmessages", "Firewall messages sent.",
+                 "counter"),
+    MetricFamily("sended_messages", "applejuice_server_sended_messages", "Messages sent.", "counter"),
+    MetricFamily("responded_i_asks", "applejuice_server_responded_i_asks", "I-asks responded.", "counter"),
+    MetricFamily("searches", "applejuice_server_searches", "Searches.", "counter"),
+)
+
+NETWORK_FAMILIES = (
+    MetricFamily("globaluser", "applejuice_network_users", "Users in the whole network."),
+    MetricFamily("globalfilecount", "applejuice_network_files", "Files shared in the whole network."),
+    MetricFamily("globalfilesize", "applejuice_network_files_bytes", "Size of the files shared in the whole network."),
+)
+
+UP_FAMILY = MetricFamily("", "applejuice_server_up", "Whether the last refresh of the server succeeded.")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _samples(families: tuple[MetricFamily, ...], data: dict, labels: str) -> dict:
+    """Sample line of every family with a value, keyed by family name."""
+    samples = {}
+    for family in families:
+        value = data.get(family.key)
+        if value is None:
+            continue
+        if family.scale != 1:
+            value = value * family.scale
+        suffix = "_total" if family.type == "counter" else ""
+        samples[family.name] = f"{family.name}{suffix}{labels} {_format(value)}"
+    return samples
+
+
+class OpenMetricsRenderer:
+    """Renders the data of all coordinators, and keeps the result until one of them has new data.
+
+    Coordinators replace their data on every refresh that fetched something, so comparing the
+    data objects is enough to notice a change. A scrape without one returns the rendered bytes.
+    """
+
+    def __init__(self):
+        """Init."""
+        self._server_samples = {}
+        self._rendered = None
+        self._rendered_from = None
+
+    def render(self, coordinators: list, network) -> bytes:
+        """Exposition of all servers and the network."""
+        sources = [(coordinator, coordinator.data, coordinator.last_update_success)
+                   for coordinator in coordinators + ([network] if network is not None else [])]
+        if self._rendered is not None and _same_sources(sources, self._rendered_from):
+            return self._rendered
+
+        self._server_samples = {
+            coordinator: self._samples_of(coordinator, data, success)
+            for coordinator, data, success in sources[:len(coordinators)]
+        }
+        servers = [samples for _, _, samples in self._server_samples.values()]
+
+        lines = []
+        for family in (UP_FAMILY,) + SERVER_FAMILIES:
+            family_lines = [samples[family.name] for samples in servers if family.name in samples]
+            if family_lines:
+                lines.extend(_header(family))
+                lines.extend(family_lines)
+
+        network_samples = _samples(NETWORK_FAMILIES, network.data or {}, "") if network is not None else {}
+        for family in NETWORK_FAMILIES:
+            if family.name in network_samples:
+                lines.extend(_header(family))
+                lines.append(network_samples[family.name])
+
+        lines.append("# EOF\n")
+        self._rendered = "\n".join(lines).encode()
+        self._rendered_from = sources
+        return self._rendered
+
+    def _samples_of(self, coordinator, data: dict | None, success: bool) -> tuple:
+        """Data, success and sample lines of one server, the lines are reused while the data stays the same."""
+        cached = self._server_samples.get(coordinator)
+        if cached is not None and cached[0] is data and cached[1] == success:
+            return cached
+
+        labels = (f'{{host="{_escape(coordinator.config_entry.data.get(CONF_URL))}",'
+                  f'port="{_escape(coordinator.config_entry.data.get(CONF_PORT))}"}}')
+        samples = {UP_FAMILY.name: f"{UP_FAMILY.name}{labels} {_format(success)}"}
+        samples.update(_samples(SERVER_FAMILIES, data or {}, labels))
+        return data, success, samples
+
+
+def _same_sources(sources: list, previous: list | None) -> bool:
+    if previous is None or len(sources) != len(previous):
+        return False
+    return all(
+        coordinator is previous_coordinator and data is previous_data and success == previous_success
+        for (coordinator, data, success), (previous_coordinator, previous_data, previous_success)
+        in zip(sources, previous)
+    )
+
+
+def _header(family: MetricFamily) -> list[str]:
+    return [f"# TYPE {family.name} {family.type}", f"# HELP {family.name} {family.help}"]
+
+
+class AppleJuiceMetricsView(HomeAssistantView):
+    """Serves the metrics of all loaded appleJuice Servers."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+    requires_auth = True
+
+    def __init__(self):
+        """Init."""
+        self.renderer = OpenMetricsRenderer()
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the current metrics."""
+        hass = request.app[KEY_HASS]
+        domain_data = hass.data.get(DOMAIN, {})
+        coordinators = [
+            domain_data[entry.entry_id]
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.entry_id in domain_data
+        ]
+        if not coordinators:
+            return web.Response(status=HTTPStatus.NOT_FOUND, text="No appleJuice Server loaded",
+                                content_type=CONTENT_TYPE_TEXT_PLAIN)
+
+        body = self.renderer.render(coordinators, domain_data.get(DATA_NETWORK))
+        return web.Response(body=body, headers={hdrs.CONTENT_TYPE: CONTENT_TYPE_OPENMETRICS})
@@ -0,0 +1,290 @@
+"""Parsers for the appleJuice Server info and status pages."""
+
+import math
+import re
+from dataclasses import dataclass
+from xml.parsers import expat
+
+INFO_ROOT = "applejuiceserver"
+
+
+def _float_to_int(value: str) -> int:
+    """Convert sizes like "7.1E15" to int."""
+    return int(float(value))
+
+
+# the same on every server, they describe the whole network
+NETWORK_INFO_FIELDS = {
+    "globaluser": int,
+    "globalfilecount": int,
+    "globalfilesize": _float_to_int,
+}
+
+SERVER_INFO_FIELDS = {
+    "user": int,
+    "filecount": int,
+    "filesize": _float_to_int,
+}
+
+INFO_FIELDS = {**NETWORK_INFO_FIELDS, **SERVER_INFO_FIELDS}
+
+VALUE_PATTERNS = {
+    int: r"\d+",
+    float: r"\d+\.\d+",
+}
+
+# walks the page from one "label: number" pair to the next
+_TOKENIZER = re.compile(r": \d")
+_SEPARATOR_LENGTH = 2
+_LABEL_KEY_LENGTH = 4
+# room for a number at the end of an incomplete page, it is only read once more text follows
+_PENDING_LENGTH = 64
+
+
+@dataclass(frozen=True)
+class StatusField:
+    """Describes a single value on the /status_raw.htm page.
+
+    Most values are a `label: number` pair, `label` is then the literal text in front of the colon.
+    Values in any other layout set `pattern` instead, a regex with a single group for the number.
+    `suffix` is the literal text that has to follow the number.
+    """
+
+    key: str
+    label: str | None = None
+    type: type = int
+    suffix: str = ""
+    pattern: str | None = None
+
+
+STATUS_FIELDS: tuple[StatusField, ...] = (
+    StatusField("firewalled", pattern=r"users \((\d+) firewalled\) share"),
+    StatusField("open_connections", "open connections"),
+    StatusField("memory_used", "used", suffix=" "),
+    StatusField("memory_free", "free", suffix=" "),
+    StatusField("memory_max", "max ", suffix=" "),
+    StatusField("upspeed_last_10_sec", "upspeed last 10 sec", float, suffix=" "),
+    StatusField("downspeed_last_10_sec", "downspeed last 10 sec", float, suffix=" "),
+    StatusField("sended_sources", "sended sources"),
+    StatusField("sended_local_sources", "sended local sources"),
+    StatusField("sended_searchmessages", "sended searchmessages"),
+    StatusField("sended_firewallmessages", "sended firewallmessages"),
+    StatusField("sended_messages", "sended messages"),
+    StatusField("messagesize", "messagesize"),
+    StatusField("responded_i_asks", "responded i-asks"),
+    StatusField("searches", "searches"),
+    StatusField("open_sockettasks", "open sockettasks"),
+)
+
+
+def _number(convert, text: str) -> int | float | None:
+    """Convert a number of the page, None when it does not fit in a float, all values end up in float math."""
+    try:
+        value = convert(text)
+        return value if math.isfinite(value) else None
+    except (OverflowError, ValueError):
+        return None
+
+
+def index_labels(fields: tuple[StatusField, ...]) -> dict[str, tuple]:
+    """Index the labelled fields by the last characters of their label, longest label first."""
+    index = {}
+    for field in sorted((field for field in fields if field.label), key=lambda field: -len(field.label)):
+        value = re.compile(f"({VALUE_PATTERNS[field.type]}){re.escape(field.suffix)}")
+        index.setdefault(field.label[-_LABEL_KEY_LENGTH:], []).append((field.label, field.key, field.type, value))
+    return {key: tuple(candidates) for key, candidates in index.items()}
+
+
+_STATUS_KEYS = tuple(field.key for field in STATUS_FIELDS)
+_STATUS_LABELS = index_labels(STATUS_FIELDS)
+_STATUS_LABELLED = sum(len(candidates) for candidates in _STATUS_LABELS.values())
+_STATUS_LABEL_LENGTH = max(len(field.label) for field in STATUS_FIELDS if field.label)
+_STATUS_PATTERNS = tuple(
+    (field.key, field.type, re.compile(field.pattern + re.escape(field.suffix)))
+    for field in STATUS_FIELDS if field.pattern
+)
+
+
+class StatusParser:
+    """Parses /status_raw.htm in a single pass, fed with consecutive pieces of the page.
+
+    The tokenizer stops at every number behind a ": ", the label in front of it is then
+    looked up by its last characters, so no field needs its own scan of the page. A number
+    close to the end of the text fed so far waits for the next piece, it may continue there.
+    Only the unparsed tail of the text is kept, so feeding a page piece by piece stays linear.
+    """
+
+    def __init__(self):
+        """Init."""
+        self.snapshot = dict.fromkeys(_STATUS_KEYS)
+        self._missing = _STATUS_LABELLED
+        self._patterns = list(_STATUS_PATTERNS)
+        self._ok = False
+        self._text = ""
+        self._position = 0
+        self._searched = 0
+
+    @property
+    def complete(self) -> bool:
+        """Every field has been found, the rest of the page is not needed."""
+        return not self._missing and not self._patterns and self._ok
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        """Parse the next piece of the page, return True once every field has been found."""
+        self._text = text = self._text + text
+        snapshot = self.snapshot
+        limit = len(text) if final else len(text) - _PENDING_LENGTH
+        position = max(self._position, len(text) - _SEPARATOR_LENGTH)
+
+        for token in _TOKENIZER.finditer(text, self._position):
+            end = token.start()
+            if end > limit:
+                position = end
+                break
+            for label, key, convert, value in _STATUS_LABELS.get(text[end - _LABEL_KEY_LENGTH:end], ()):
+                if text.endswith(label, 0, end):
+                    if snapshot[key] is None:
+                        match = value.match(text, end + _SEPARATOR_LENGTH)
+                        if match:
+                            snapshot[key] = _number(convert, match.group(1))
+                            if snapshot[key] is not None:
+                                self._missing -= 1
+                    break
+            if not self._missing:
+                break
+        self._position = position
+
+        # patterns and the status may straddle the previous piece, search a little before it
+        searched = max(0, self._searched - _PENDING_LENGTH)
+        for pattern in list(self._patterns):
+            key, convert, regex = pattern
+            match = regex.search(text, searched)
+            if match:
+                snapshot[key] = _number(convert, match.group(1))
+                if snapshot[key] is not None:
+                    self._patterns.remove(pattern)
+        self._ok = self._ok or text.find(">ok<", searched) != -1
+
+        # keep the label in front of the next token and the text the next searches look back at
+        consumed = max(0, min(self._position - _STATUS_LABEL_LENGTH, len(text) - _PENDING_LENGTH))
+        self._text = text[consumed:]
+        self._position -= consumed
+        self._searched = len(text) - consumed
+
+        return self.complete
+
+    def close(self) -> dict:
+        """Parse what is left and return the values, fields missing from the page are None."""
+        if not self.complete:
+            self.feed("", True)
+        self.snapshot["serverstatus_ok"] = self._ok
+        return self.snapshot
+
+
+def parse_status(text: str) -> dict:
+    """Parse a complete /status_raw.htm."""
+    parser = StatusParser()
+    parser.feed(text, True)
+    return parser.close()
+
+
+def parse_status_json(payload: dict) -> dict:
+    """Validate a pushed status, a JSON object keyed like the result of parse_status.
+
+    Only the keys present in the payload are returned, so a push may carry just the values that
+    changed. Unknown keys are ignored, a value of the wrong type or a non-finite number raises ValueError.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("status payload must be a JSON object")
+
+    snapshot = {}
+    for field in STATUS_FIELDS:
+        value = payload.get(field.key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"invalid value for {field.key}: {value!r}")
+        # "nan", "inf" and numbers too large for a float would poison every model fed with the value
+        try:
+            converted = field.type(value)
+            finite = math.isfinite(converted)
+        except OverflowError as e:
+            raise ValueError(f"invalid value for {field.key}: {value!r}") from e
+        if not finite:
+            raise ValueError(f"invalid value for {field.key}: {value!r}")
+        snapshot[field.key] = converted
+
+    if "serverstatus_ok" in payload:
+        if not isinstance(payload["serverstatus_ok"], bool):
+            raise ValueError(f"invalid value for serverstatus_ok: {payload['serverstatus_ok']!r}")
+        snapshot["serverstatus_ok"] = payload["serverstatus_ok"]
+
+    return snapshot
+
+
+class _InfoComplete(Exception):
+    """Raised from the expat handlers once every requested field has been read."""
+
+
+class InfoParser:
+    """Parses the children of <applejuiceserver> in /info.xml, fed with consecutive pieces of the document.
+
+    The document is streamed through expat and parsing stops as soon as every field has been
+    read, no tree is built. Fields missing from the document are None.
+    """
+
+    def __init__(self, fields: dict = INFO_FIELDS):
+        """Init."""
+        self.snapshot = dict.fromkeys(fields)
+        self.complete = False
+        self._finished = False
+        self._fields = fields
+        self._missing = len(fields)
+        self._path = []
+        self._found = []
+
+        self._parser = expat.ParserCreate("utf-8")
+        self._parser.StartElementHandler = self._start_element
+        self._parser.CharacterDataHandler = self._character_data
+        self._parser.EndElementHandler = self._end_element
+
+    def _start_element(self, name, attrs):
+        self._path.append(name)
+
+    def _character_data(self, data):
+        path = self._path
+        if len(path) == 2 and path[0] == INFO_ROOT and path[1] in self._fields:
+            self._found.append(data)
+
+    def _end_element(self, name):
+        path = self._path
+        if len(path) == 2 and path[0] == INFO_ROOT and name in self._fields and self.snapshot[name] is None:
+            self.snapshot[name] = self._fields[name]("".join(self._found).strip())
+            self._missing -= 1
+            if not self._missing:
+                raise _InfoComplete
+        self._found.clear()
+        path.pop()
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        """Parse the next piece of the document, return True once every field has been read."""
+        if not self.complete and not self._finished:
+            try:
+                self._parser.Parse(text, final)
+            except _InfoComplete:
+                self.complete = True
+            self._finished = final
+        return self.complete
+
+    def close(self) -> dict:
+        """Finish the document, unless the last piece was already fed as final, and return the values."""
+        self.feed("", True)
+        return self.snapshot
+
+
+def parse_info(text: str, fields: dict = INFO_FIELDS) -> dict:
+    """Parse a complete /info.xml."""
+    parser = InfoParser(fields)
+    parser.feed(text, True)
+    return parser.close()
+
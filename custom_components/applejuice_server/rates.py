@@ -0,0 +1,47 @@
+"""Rates of the cumulative appleJuice Server counters."""
+
+RATE_COUNTERS = (
+    "sended_messages",
+    "sended_sources",
+    "searches",
+    "responded_i_asks",
+    "sended_searchmessages",
+)
+
+
+class CounterRates:
+    """Turns cumulative counters into per-second and per-minute rates.
+
+    Only the previous sample of each counter is kept, so every update is O(1) per counter.
+    """
+
+    def __init__(self, counters: tuple[str, ...] = RATE_COUNTERS):
+        """Init."""
+        self._counters = counters
+        self._previous = {}
+
+    def update(self, data: dict, timestamp: float) -> dict:
+        """Return the rates of the counters in `data`, sampled at `timestamp` (seconds)."""
+        rates = {}
+
+        for key in self._counters:
+            if key not in data:
+                continue
+
+            value = data[key]
+            previous = self._previous.get(key)
+            rate = None
+
+            if value is not None:
+                if previous is not None and timestamp > previous[0]:
+                    delta = value - previous[1]
+                    # the counter restarted from zero, e.g. after a server restart
+                    if delta < 0:
+                        delta = value
+                    rate = delta / (timestamp - previous[0])
+                self._previous[key] = (timestamp, value)
+
+            rates[f"{key}_per_second"] = rate
+            rates[f"{key}_per_minute"] = rate * 60 if rate is not None else None
+
+        return rates
@@ -0,0 +1,89 @@
+"""Polling scheduler shared by all appleJuice Server config entries."""
+
+import asyncio
+import logging
+import zlib
+from contextlib import asynccontextmanager
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import MAX_CONCURRENT_REQUESTS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AppleJuiceScheduler:
+    """Owns the polling of all config entries.
+
+    Every coordinator is polled at a fixed offset inside its interval, derived from its schedule id,
+    so many servers do not all fire on the same boundary. Requests of all coordinators share a
+    bounded number of slots.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+        """Init."""
+        self.hass = hass
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._timers = {}
+        self._polls = {}
+        self.queue_depth = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    @callback
+    def async_add(self, coordinator) -> None:
+        """Start polling a coordinator."""
+        interval = coordinator.poll_interval.total_seconds()
+        offset = zlib.crc32(coordinator.schedule_id.encode()) % 1000 / 1000 * interval
+        self._async_schedule(coordinator, self.hass.loop.time() + offset)
+
+    @callback
+    def async_remove(self, coordinator) -> None:
+        """Stop polling a coordinator."""
+        schedule_id = coordinator.schedule_id
+        if (timer := self._timers.pop(schedule_id, None)) is not None:
+            timer.cancel()
+        if (poll := self._polls.pop(schedule_id, None)) is not None:
+            poll.cancel()
+
+    @asynccontextmanager
+    async def async_request_slot(self):
+        """Wait for one of the shared request slots."""
+        self.queue_depth += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queue_depth -= 1
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    @callback
+    def _async_schedule(self, coordinator, due: float) -> None:
+        self._timers[coordinator.schedule_id] = self.hass.loop.call_at(
+            due, self._async_start_poll, coordinator, due
+        )
+
+    @callback
+    def _async_start_poll(self, coordinator, due: float) -> None:
+        schedule_id = coordinator.schedule_id
+        self._timers.pop(schedule_id, None)
+        self._polls[schedule_id] = self.hass.async_create_background_task(
+            self._async_poll(coordinator, due), name=f"{coordinator.name} poll"
+        )
+
+    async def _async_poll(self, coordinator, due: float) -> None:
+        loop = self.hass.loop
+        self.lag = loop.time() - due
+        self.max_lag = max(self.max_lag, self.lag)
+        _LOGGER.debug("polling %s, lag %.3fs, queue depth %d", coordinator.name, self.lag, self.queue_depth)
+
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._polls.pop(coordinator.schedule_id, None)
+
+        # stay on the same phase, unless the poll took longer than a whole interval
+        next_due = due + coordinator.poll_interval.total_seconds()
+        self._async_schedule(coordinator, max(next_due, loop.time()))
@@ -5,11 +5,14 @@ from datetime import datetime
 
 from homeassistant.const import (
     EntityCategory,
+    Platform,
     UnitOfInformation,
     UnitOfDataRate,
+    UnitOfTime,
 )
 
 from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -18,12 +21,49 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 
-from .const import DOMAIN
-from .entity import BaseAppleJuiceServerEntity, BaseAppleJuiceNetworkEntity
+from .const import DOMAIN, DATA_NETWORK, HISTORY_ATTRIBUTE_WINDOW, ATTR_STALE
+from .entity import BaseAppleJuiceServerEntity, BaseAppleJuiceNetworkEntity, stale_attributes
+from .breaker import BREAKER_STATES
+from .rates import RATE_COUNTERS
+from .timing import TIMING_PHASES
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _within_deadband(sensor, value) -> bool:
+    """Check if a new value is too close to the current state to be worth writing."""
+    deadband = sensor.entity_description.deadband
+    if deadband is None or sensor.coordinator.changed_keys is None:
+        return False
+    if value is None or sensor.native_value is None:
+        return False
+    return abs(value - sensor.native_value) < deadband
+
+
+HISTORY_ATTRIBUTES = frozenset(
+    f"{name}_{HISTORY_ATTRIBUTE_WINDOW // 60}min" for name in ("min", "max", "mean", "p50", "p95")
+)
+
+
+def _history_attributes(sensor) -> dict | None:
+    """Windowed statistics of the metric behind a sensor, as computed by the coordinator on the last refresh."""
+    if not sensor.entity_description.history:
+        return None
+    stats = sensor.coordinator.history_stats.get(sensor.entity_description.subscriptions[0])
+    if stats is None:
+        return None
+
+    return {
+        f"{name}_{HISTORY_ATTRIBUTE_WINDOW // 60}min": _round(stats[name], 4)
+        for name in ("min", "max", "mean", "p50", "p95")
+    }
+
+
+def _round(value, digits: int, divisor: int = 1):
+    """Round a coordinator value, None stays None."""
+    return round(value / divisor, digits) if value is not None else None
+
+
 @dataclass
 class AppleJuiceServerSensorDescription(SensorEntityDescription):
     """Class describing appleJuice Server sensor entities."""
@@ -38,6 +78,8 @@ class AppleJuiceServerSensorDescription(SensorEntityDescription):
     device_class: str | None = None
     subscriptions: list | None = None
     entity_category: str | None = None
+    deadband: float | None = None
+    history: bool = True
 
 
 SENSORS_SERVER: tuple[AppleJuiceServerSensorDescription, ...] = [
@@ -71,8 +113,9 @@ SENSORS_SERVER: tuple[AppleJuiceServerSensorDescription, ...] = [
         icon="mdi:file-chart",
         state_class=SensorStateClass.TOTAL,
         unit=UnitOfInformation.TERABYTES,
+        history=False,
         subscriptions=[("filesize")],
-        value_fn=lambda sensor: round(sensor.coordinator.data.get("filesize") / (1024 ** 4), 2),
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get("filesize"), 2, 1024 ** 4),
     ),
     AppleJuiceServerSensorDescription(
         key="open_connections",
@@ -125,7 +168,8 @@ SENSORS_SERVER: tuple[AppleJuiceServerSensorDescription, ...] = [
         unit=UnitOfDataRate.KILOBYTES_PER_SECOND,
         entity_category=EntityCategory.DIAGNOSTIC,
         subscriptions=[("upspeed_last_10_sec")],
-        value_fn=lambda sensor: round(sensor.coordinator.data.get("upspeed_last_10_sec"), 4),
+        deadband=0.5,
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get("upspeed_last_10_sec"), 4),
     ),
     AppleJuiceServerSensorDescription(
         key="downspeed_last_10_sec",
@@ -136,7 +180,8 @@ SENSORS_SERVER: tuple[AppleJuiceServerSensorDescription, ...] = [
         unit=UnitOfDataRate.KILOBYTES_PER_SECOND,
         entity_category=EntityCategory.DIAGNOSTIC,
         subscriptions=[("downspeed_last_10_sec")],
-        value_fn=lambda sensor: round(sensor.coordinator.data.get("downspeed_last_10_sec"), 4),
+        deadband=0.5,
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get("downspeed_last_10_sec"), 4),
     ),
     AppleJuiceServerSensorDescription(
         key="sended_sources",
@@ -218,7 +263,125 @@ SENSORS_SERVER: tuple[AppleJuiceServerSensorDescription, ...] = [
         entity_category=EntityCategory.DIAGNOSTIC,
         subscriptions=[("open_sockettasks")],
         value_fn=lambda sensor: sensor.coordinator.data.get("open_sockettasks"),
+    ),
+    AppleJuiceServerSensorDescription(
+        key="polling_interval",
+        name="Polling Interval",
+        icon="mdi:timer-sync-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        unit=UnitOfTime.SECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        subscriptions=[("polling_interval")],
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get("polling_interval"), 1),
+    ),
+]
+
+
+def _rate_sensor(counter: AppleJuiceServerSensorDescription, period: str, enabled: bool):
+    """Describe the rate of a cumulative counter sensor."""
+    key = f"{counter.key}_per_{period}"
+    return AppleJuiceServerSensorDescription(
+        key=key,
+        name=f"{counter.name} per {period.capitalize()}",
+        icon=counter.icon,
+        state_class=SensorStateClass.MEASUREMENT,
+        unit=f"/{'s' if period == 'second' else 'min'}",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=enabled,
+        subscriptions=[(key)],
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get(key), 3),
     )
+
+
+SENSORS_RATE: tuple[AppleJuiceServerSensorDescription, ...] = [
+    _rate_sensor(counter, period, enabled)
+    for counter in SENSORS_SERVER if counter.key in RATE_COUNTERS
+    for period, enabled in (("second", True), ("minute", False))
+]
+
+TIMING_NAMES = {
+    "network": "Network Time",
+    "parse": "Parse Time",
+    "fan_out": "Fan-out Time",
+    "update": "Update Time",
+}
+
+
+def _timing_sensor(phase: str, percent: int):
+    """Describe a rolling percentile of the time spent in one phase of a refresh.
+
+    Disabled by default, they change with nearly every refresh and the diagnostics carry the full breakdown.
+    """
+    key = f"{phase}_time_p{percent}"
+    return AppleJuiceServerSensorDescription(
+        key=key,
+        name=f"{TIMING_NAMES[phase]} P{percent}",
+        icon="mdi:timer-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        unit=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        subscriptions=[(key)],
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get(key), 3),
+    )
+
+
+SENSORS_TIMING: tuple[AppleJuiceServerSensorDescription, ...] = [
+    _timing_sensor(phase, percent)
+    for phase in TIMING_PHASES
+    for percent in (95, 50)
+]
+
+# read from the circuit breaker of the client, not from the data, and updated on every refresh
+SENSORS_BREAKER: tuple[AppleJuiceServerSensorDescription, ...] = [
+    AppleJuiceServerSensorDescription(
+        key="circuit_breaker",
+        name="Circuit Breaker",
+        icon="mdi:electric-switch",
+        device_class=SensorDeviceClass.ENUM,
+        options=BREAKER_STATES,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        history=False,
+        value_fn=lambda sensor: sensor.coordinator.client.breaker.state,
+    ),
+    AppleJuiceServerSensorDescription(
+        key="consecutive_failures",
+        name="Consecutive Failures",
+        icon="mdi:lan-disconnect",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        history=False,
+        value_fn=lambda sensor: sensor.coordinator.client.breaker.failures,
+    ),
+]
+
+SENSORS_FORECAST: tuple[AppleJuiceServerSensorDescription, ...] = [
+    AppleJuiceServerSensorDescription(
+        key="memory_time_to_max",
+        name="Time Until Memory Max",
+        icon="mdi:memory-arrow-down",
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        unit=UnitOfTime.HOURS,
+        subscriptions=[("memory_time_to_max")],
+        deadband=0.01,
+        history=False,
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get("memory_time_to_max"), 2, 3600),
+    ),
+    AppleJuiceServerSensorDescription(
+        key="memory_growth_rate",
+        name="Memory Growth Rate",
+        icon="mdi:memory",
+        state_class=SensorStateClass.MEASUREMENT,
+        unit=f"{UnitOfInformation.KILOBYTES}/{UnitOfTime.HOURS}",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        subscriptions=[("memory_growth_rate")],
+        history=False,
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get("memory_growth_rate"), 1, 1 / 3600),
+    ),
 ]
 
 SENSORS_NETWORK: tuple[AppleJuiceServerSensorDescription, ...] = [
@@ -245,7 +408,7 @@ SENSORS_NETWORK: tuple[AppleJuiceServerSensorDescription, ...] = [
         unit=UnitOfInformation.TERABYTES,
         device_class=SensorDeviceClass.DATA_SIZE,
         subscriptions=[("globalfilesize")],
-        value_fn=lambda sensor: round(sensor.coordinator.data.get("globalfilesize") / (1024 ** 4), 2),
+        value_fn=lambda sensor: _round(sensor.coordinator.data.get("globalfilesize"), 2, 1024 ** 4),
     ),
 ]
 
@@ -259,18 +422,49 @@ async def async_setup_entry(hass, entry, async_add_entities):
 
 async def async_setup_basic_sensor(coordinator, entry, async_add_entities):
     """Set basic sensor platform."""
+    descriptions = SENSORS_SERVER + SENSORS_RATE + SENSORS_TIMING + SENSORS_FORECAST
+    if coordinator.statistics is not None:
+        # their statistics are imported hourly, without recording a state row at every poll, sensors
+        # without a statistic stay
+        imported = {metric.key for metric in coordinator.statistics.metrics}
+        skipped = {
+            desc.key for desc in descriptions
+            if desc.entity_category == EntityCategory.DIAGNOSTIC and desc.subscriptions
+            and desc.subscriptions[0] in imported
+        }
+        _async_remove_sensors(coordinator.hass, entry, skipped)
+        descriptions = [desc for desc in descriptions if desc.key not in skipped]
+
     async_add_entities(
-        [AppleJuiceServerSensor(coordinator, entry, desc) for desc in SENSORS_SERVER] +
-        [AppleJuiceNetworkSensor(coordinator, entry, desc) for desc in SENSORS_NETWORK]
+        [AppleJuiceServerSensor(coordinator, entry, desc) for desc in descriptions] +
+        [AppleJuiceBreakerSensor(coordinator, entry, desc) for desc in SENSORS_BREAKER]
     )
 
+    # one set of network sensors for all entries, added by whichever entry holds them
+    network = coordinator.network
+    entry.async_on_unload(network.async_offer_entity_owner(entry.entry_id, lambda: async_add_entities(
+        [AppleJuiceNetworkSensor(network, entry, desc) for desc in SENSORS_NETWORK]
+    )))
+
+
+@callback
+def _async_remove_sensors(hass, entry, keys) -> None:
+    """Remove sensors of an entry that are no longer created from the entity registry."""
+    entity_registry = er.async_get(hass)
+    for key in keys:
+        entity_id = entity_registry.async_get_entity_id(Platform.SENSOR, DOMAIN, f"{entry.entry_id}_{key}")
+        if entity_id is not None:
+            entity_registry.async_remove(entity_id)
+
 
 class AppleJuiceServerSensor(BaseAppleJuiceServerEntity, SensorEntity):
     """AppleJuiceServerSensor Sensor class."""
 
+    _unrecorded_attributes = HISTORY_ATTRIBUTES | {ATTR_STALE}
+
     def __init__(self, coordinator, entry, description):
         """Init."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, description.subscriptions)
         self.coordinator = coordinator
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_name = description.name
@@ -283,18 +477,36 @@ class AppleJuiceServerSensor(BaseAppleJuiceServerEntity, SensorEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._attr_native_value = self.entity_description.value_fn(self)
+        value = self.entity_description.value_fn(self)
+        if _within_deadband(self, value):
+            return
+        self._attr_native_value = value
         self.async_write_ha_state()
 
+    @property
+    def extra_state_attributes(self):
+        """Statistics over the recent history of the sensor, and the stale mark of restored values."""
+        attributes = {**(_history_attributes(self) or {}), **(stale_attributes(self.coordinator) or {})}
+        return attributes or None
+
+
+class AppleJuiceBreakerSensor(AppleJuiceServerSensor):
+    """Circuit breaker sensor, available especially while the server is not."""
+
+    @property
+    def available(self) -> bool:
+        """Always available."""
+        return True
+
 
 class AppleJuiceNetworkSensor(BaseAppleJuiceNetworkEntity, SensorEntity):
     """AppleJuiceNetworkSensor Sensor class."""
 
     def __init__(self, coordinator, entry, description):
         """Init."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, description.subscriptions)
         self.coordinator = coordinator
-        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_unique_id = f"{DATA_NETWORK}_{description.key}"
         self._attr_name = description.name
         self._attr_has_entity_name = True
         self.entity_description = description
@@ -305,5 +517,8 @@ class AppleJuiceNetworkSensor(BaseAppleJuiceNetworkEntity, SensorEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._attr_native_value = self.entity_description.value_fn(self)
+        value = self.entity_description.value_fn(self)
+        if _within_deadband(self, value):
+            return
+        self._attr_native_value = value
         self.async_write_ha_state()
@@ -0,0 +1,176 @@
+"""Hourly long-term statistics, imported into the recorder instead of recording every state."""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.const import UnitOfDataRate, UnitOfInformation
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StatisticsMetric:
+    """A coordinator value imported as statistic, in the unit of its sensor."""
+
+    key: str
+    name: str
+    unit: str | None = None
+    divisor: int = 1
+    counter: bool = False
+
+
+STATISTICS_SERVER = (
+    StatisticsMetric("user", "Users"),
+    StatisticsMetric("firewalled", "Users Firewalled"),
+    StatisticsMetric("filecount", "File Count"),
+    StatisticsMetric("filesize", "File Size", UnitOfInformation.TERABYTES, 1024 ** 4),
+    StatisticsMetric("open_connections", "Open Connections"),
+    StatisticsMetric("open_sockettasks", "Open Socket Tasks"),
+    StatisticsMetric("memory_used", "Memory Used", UnitOfInformation.KILOBYTES),
+    StatisticsMetric("memory_free", "Memory Free", UnitOfInformation.KILOBYTES),
+    StatisticsMetric("upspeed_last_10_sec", "Upload Speed", UnitOfDataRate.KILOBYTES_PER_SECOND),
+    StatisticsMetric("downspeed_last_10_sec", "Download Speed", UnitOfDataRate.KILOBYTES_PER_SECOND),
+    StatisticsMetric("sended_sources", "Sended Sources", counter=True),
+    StatisticsMetric("sended_local_sources", "Sended Local Sources", counter=True),
+    StatisticsMetric("sended_searchmessages", "Sended Search Messages", counter=True),
+    StatisticsMetric("sended_firewallmessages", "Sended Firewall Messages", counter=True),
+    StatisticsMetric("sended_messages", "Sended Messages", counter=True),
+    StatisticsMetric("responded_i_asks", "Responded I-Asks", counter=True),
+    StatisticsMetric("searches", "Searches", counter=True),
+)
+
+STATISTICS_NETWORK = (
+    StatisticsMetric("globaluser", "Global Users"),
+    StatisticsMetric("globalfilecount", "Global File Count"),
+    StatisticsMetric("globalfilesize", "Global File Size", UnitOfInformation.TERABYTES, 1024 ** 4),
+)
+
+
+class HourlyStatistics:
+    """Aggregates the samples of the running hour in memory, one hour at a time.
+
+    Gauges get mean, min and max, counters the last state and the sum of their increases,
+    continued across restarts and counter resets.
+    """
+
+    def __init__(self, metrics: tuple[StatisticsMetric, ...], object_id: str, name: str):
+        """Init, `object_id` prefixes the statistic ids and `name` the statistic names."""
+        self.metrics = metrics
+        self.object_id = object_id
+        self.name = name
+        self.hour = None
+        self.sums = {}
+        self._samples = {}
+
+    def statistic_id(self, metric: StatisticsMetric) -> str:
+        """External statistic id of a metric."""
+        return f"{DOMAIN}:{self.object_id}_{metric.key}"
+
+    def add(self, data: dict, now: datetime) -> tuple[datetime, dict] | None:
+        """Add a sample, return the start and the samples of the previous hour once it is over."""
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        completed = None
+        if self.hour is not None and hour != self.hour and self._samples:
+            completed = (self.hour, self._samples)
+            self._samples = {}
+        self.hour = hour
+
+        for metric in self.metrics:
+            value = data.get(metric.key)
+            if value is None:
+                continue
+            value /= metric.divisor
+            sample = self._samples.get(metric.key)
+            if sample is None:
+                self._samples[metric.key] = [value, value, value, 1, value]
+            else:
+                sample[0] = min(sample[0], value)
+                sample[1] = max(sample[1], value)
+                sample[2] += value
+                sample[3] += 1
+                sample[4] = value
+
+        return completed
+
+    def as_dict(self) -> dict | None:
+        """Samples of the running hour to save, None without any."""
+        if self.hour is None or not self._samples:
+            return None
+        return {"hour": self.hour.isoformat(), "samples": self._samples}
+
+    def restore(self, saved: dict | None, now: datetime) -> tuple[datetime, dict] | None:
+        """Continue the saved running hour, or return its start and samples when that hour is over."""
+        if not saved:
+            return None
+        hour = dt_util.parse_datetime(saved["hour"])
+        samples = {metric.key: list(saved["samples"][metric.key])
+                   for metric in self.metrics if metric.key in saved["samples"]}
+        if hour is None or not samples:
+            return None
+
+        if hour == now.replace(minute=0, second=0, microsecond=0):
+            self.hour = hour
+            self._samples = samples
+            return None
+        return (hour, samples) if hour < now else None
+
+    def metadata(self, metric: StatisticsMetric) -> StatisticMetaData:
+        """Metadata of the statistic of a metric."""
+        return StatisticMetaData(
+            has_mean=not metric.counter,
+            has_sum=metric.counter,
+            name=f"{self.name} {metric.name}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id(metric),
+            unit_of_measurement=metric.unit,
+        )
+
+    def statistic(self, metric: StatisticsMetric, hour: datetime, sample: list) -> StatisticData:
+        """Statistic of one hour of a metric, counters need their last sum in `sums` first."""
+        minimum, maximum, total, count, state = sample
+        if not metric.counter:
+            return StatisticData(start=hour, mean=total / count, min=minimum, max=maximum)
+
+        previous = self.sums.get(metric.key)
+        if previous is None:
+            total = 0.0
+        else:
+            # a counter lower than before was reset, it counted up from zero since
+            increase = state - previous[0] if state >= previous[0] else state
+            total = previous[1] + increase
+        self.sums[metric.key] = (state, total)
+        return StatisticData(start=hour, state=state, sum=total)
+
+
+async def async_import_hour(hass: HomeAssistant, statistics: HourlyStatistics, hour: datetime, samples: dict) -> None:
+    """Import the aggregated samples of one hour into the recorder."""
+    for metric in statistics.metrics:
+        sample = samples.get(metric.key)
+        if sample is None:
+            continue
+
+        if metric.counter and metric.key not in statistics.sums:
+            statistics.sums[metric.key] = await _async_last_sum(hass, statistics.statistic_id(metric))
+
+        async_add_external_statistics(hass, statistics.metadata(metric), [statistics.statistic(metric, hour, sample)])
+
+    _LOGGER.debug("%s imported statistics of %s", statistics.name, hour)
+
+
+async def _async_last_sum(hass: HomeAssistant, statistic_id: str) -> tuple[float, float] | None:
+    """Last state and sum of an imported counter, to continue its sum after a restart."""
+    last = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, statistic_id, False, {"state", "sum"}
+    )
+    rows = last.get(statistic_id)
+    if not rows or rows[0].get("state") is None or rows[0].get("sum") is None:
+        return None
+    return rows[0]["state"], rows[0]["sum"]
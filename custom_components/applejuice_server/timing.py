@@ -0,0 +1,45 @@
+"""Rolling timings of the phases of a coordinator refresh."""
+
+from collections import deque
+
+from .history import percentile
+
+TIMING_PHASES = ("network", "parse", "fan_out", "update")
+
+# samples kept per phase, a few minutes at the default polling rate
+TIMING_SAMPLES = 100
+
+
+class RollingTimings:
+    """Keeps the last samples of every phase and summarizes them as percentiles."""
+
+    def __init__(self, phases: tuple[str, ...] = TIMING_PHASES, samples: int = TIMING_SAMPLES):
+        """Init."""
+        self.phases = phases
+        self._samples = {phase: deque(maxlen=samples) for phase in phases}
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Add a sample, the oldest one drops out once the window is full."""
+        self._samples[phase].append(seconds)
+
+    def percentiles(self, phase: str, percentiles: tuple = (50, 95)) -> dict:
+        """Percentiles and maximum of a phase, in milliseconds."""
+        ordered = sorted(self._samples[phase])
+        return {
+            **{f"p{percent:g}": _milliseconds(percentile(ordered, percent)) for percent in percentiles},
+            "max": _milliseconds(ordered[-1] if ordered else None),
+            "samples": len(ordered),
+        }
+
+    def summary(self) -> dict:
+        """Flat p50 and p95 of every phase, keyed like `network_time_p95`."""
+        summary = {}
+        for phase in self.phases:
+            stats = self.percentiles(phase)
+            summary[f"{phase}_time_p50"] = stats["p50"]
+            summary[f"{phase}_time_p95"] = stats["p95"]
+        return summary
+
+
+def _milliseconds(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
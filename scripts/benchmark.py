@@ -0,0 +1,230 @@
+"""End-to-end polling benchmark against local stand-in servers.
+
+Boots a bare Home Assistant core, sets up one config entry per simulated server (coordinator,
+scheduler and all sensor platforms, exactly as in production) and polls for a while. Reports
+per server count:
+
+- poll latency: wall time of one coordinator refresh (p50, p95, max)
+- CPU per poll: CPU time of the event loop thread, divided by the number of polls
+- event loop lag: how late a 50 ms probe timer fires (p50, p99, max)
+- state writes per minute: entity state writes, and how many of them changed a state
+
+Runs offline, the servers are started from scripts/standin_server.py in a separate process so
+their CPU time does not count. Needs homeassistant installed:
+
+    python scripts/benchmark.py --servers 1 10 100 --duration 60 --polling-rate 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from homeassistant import auth, bootstrap, config_entries, loader
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+CUSTOM_COMPONENTS = os.path.join(os.path.dirname(SCRIPTS), "custom_components")
+
+DOMAIN = "applejuice_server"
+PROBE_INTERVAL = 0.05
+
+
+def percentile(values: list, percent: float) -> float:
+    """Nearest-rank percentile, 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class StateWriteCounter:
+    """Counts every entity state write while installed."""
+
+    def __init__(self):
+        """Init."""
+        self.writes = 0
+        self._original = Entity._async_write_ha_state
+
+    def __enter__(self):
+        """Wrap Entity._async_write_ha_state, every write path ends there."""
+        original = self._original
+
+        def _async_write_ha_state(entity):
+            self.writes += 1
+            original(entity)
+
+        Entity._async_write_ha_state = _async_write_ha_state
+        return self
+
+    def __exit__(self, *exc_info):
+        """Restore Entity._async_write_ha_state."""
+        Entity._async_write_ha_state = self._original
+
+
+async def start_standin(args: argparse.Namespace, servers: int) -> asyncio.subprocess.Process:
+    """Start the stand-in servers and wait until they listen."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(SCRIPTS, "standin_server.py"),
+        "--servers", str(servers),
+        "--port", str(args.port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--payload-size", str(args.payload_size),
+        stdout=asyncio.subprocess.PIPE,
+    )
+    await process.stdout.readline()
+    return process
+
+
+async def start_hass(config_dir: str) -> HomeAssistant:
+    """Bare Home Assistant core that finds the integration in custom_components."""
+    os.symlink(CUSTOM_COMPONENTS, os.path.join(config_dir, "custom_components"))
+    sys.path.insert(0, config_dir)
+
+    hass = HomeAssistant(config_dir)
+    # offline, the requirements of the integration and its dependencies have to be installed already
+    hass.config.skip_pip = True
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    loader.async_setup(hass)
+    await bootstrap.async_load_base_functionality(hass)
+    # needed by http, the webhook dependency, its server is only started with Home Assistant
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    return hass
+
+
+async def run(args: argparse.Namespace, servers: int) -> dict:
+    """Poll `servers` stand-in servers for the configured duration and collect the measurements."""
+    standin = await start_standin(args, servers)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await start_hass(config_dir)
+        loop = asyncio.get_running_loop()
+
+        latencies = []
+        setup_start = time.monotonic()
+        for index in range(servers):
+            entry = config_entries.ConfigEntry(
+                version=1,
+                minor_version=1,
+                domain=DOMAIN,
+                title=f"stand-in {index}",
+                data={
+                    "url": "127.0.0.1",
+                    "port": args.port + index,
+                    "username": "benchmark",
+                    "password": "benchmark",
+                    "tls": False,
+                },
+                source=config_entries.SOURCE_USER,
+                options={"polling_rate": args.polling_rate, "info_polling_rate": args.polling_rate},
+            )
+            await hass.config_entries.async_add(entry)
+        setup_time = time.monotonic() - setup_start
+
+        coordinators = [hass.data[DOMAIN][entry.entry_id] for entry in hass.config_entries.async_entries(DOMAIN)]
+        for coordinator in coordinators:
+            refresh = coordinator.async_refresh
+
+            async def timed_refresh(refresh=refresh):
+                start = time.monotonic()
+                await refresh()
+                latencies.append(time.monotonic() - start)
+
+            coordinator.async_refresh = timed_refresh
+
+        state_changes = 0
+
+        def count_state_change(event):
+            nonlocal state_changes
+            state_changes += 1
+
+        remove_listener = hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_change)
+
+        lags = []
+
+        async def probe():
+            while True:
+                due = loop.time() + PROBE_INTERVAL
+                await asyncio.sleep(PROBE_INTERVAL)
+                lags.append(loop.time() - due)
+
+        with StateWriteCounter() as counter:
+            probe_task = loop.create_task(probe())
+            cpu_start = time.thread_time()
+            await asyncio.sleep(args.duration)
+            cpu = time.thread_time() - cpu_start
+            probe_task.cancel()
+            remove_listener()
+
+        polls = len(latencies)
+        failed = sum(not coordinator.last_update_success for coordinator in coordinators)
+
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+        sys.path.remove(config_dir)
+
+    standin.terminate()
+    await standin.wait()
+
+    minutes = args.duration / 60
+    return {
+        "servers": servers,
+        "setup (s)": setup_time,
+        "polls": polls,
+        "failed": failed,
+        "latency p50 (ms)": percentile(latencies, 50) * 1000,
+        "latency p95 (ms)": percentile(latencies, 95) * 1000,
+        "latency max (ms)": max(latencies, default=0) * 1000,
+        "cpu/poll (ms)": cpu / polls * 1000 if polls else 0,
+        "cpu total (%)": cpu / args.duration * 100,
+        "loop lag p50 (ms)": percentile(lags, 50) * 1000,
+        "loop lag p99 (ms)": percentile(lags, 99) * 1000,
+        "loop lag max (ms)": max(lags, default=0) * 1000,
+        "writes/min": counter.writes / minutes,
+        "state changes/min": state_changes / minutes,
+    }
+
+
+def report(results: list[dict]) -> None:
+    """Print the results as one column per server count."""
+    width = max(len(key) for key in results[0])
+    for key in results[0]:
+        values = "".join(
+            f"{result[key]:>12.2f}" if isinstance(result[key], float) else f"{result[key]:>12}"
+            for result in results
+        )
+        print(f"{key:<{width}}{values}")
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    """Command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", type=int, nargs="+", default=[1, 10, 100], help="server counts to run")
+    parser.add_argument("--duration", type=float, default=60, help="measured time per server count (s)")
+    parser.add_argument("--polling-rate", type=int, default=5, help="polling rate of every entry (s)")
+    parser.add_argument("--port", type=int, default=19851, help="port of the first stand-in server")
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in response delay (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="stand-in delay jitter (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of stand-in requests failing")
+    parser.add_argument("--payload-size", type=int, default=5000, help="stand-in status page size (bytes)")
+    return parser.parse_args(args)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run every server count in turn."""
+    results = []
+    for servers in args.servers:
+        print(f"running {servers} server(s) for {args.duration:g}s ...", file=sys.stderr, flush=True)
+        results.append(await run(args, servers))
+    report(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
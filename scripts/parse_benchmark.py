@@ -0,0 +1,190 @@
+"""Microbenchmark of the info and status parsers against the xmltodict and regex paths they replaced.
+
+Renders /info.xml and status pages of several sizes with scripts/standin_server.py, the latter
+once with the counters in front of the server list as the stand-in server lays them out and once
+behind it, and reports per parser:
+
+- time per parse (best of --repeat runs of --number parses)
+- peak memory allocated during one parse (tracemalloc)
+
+Before measuring, both parsers have to return the same values for every page, and the current
+parsers have to return None for the fields missing from a few incomplete documents. A difference
+is reported and ends the script with exit code 1. Needs no Home Assistant, only aiohttp for the
+stand-in server module and xmltodict for the previous info path:
+
+    python scripts/parse_benchmark.py --payload-size 5000 50000 500000
+"""
+
+import argparse
+import importlib.util
+import os
+import re
+import sys
+import timeit
+import tracemalloc
+
+import xmltodict
+
+from standin_server import SimulatedServer
+
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+PARSER = os.path.join(os.path.dirname(SCRIPTS), "custom_components", "applejuice_server", "parser.py")
+
+LEGACY_STATUS_PATTERNS = (
+    ("firewalled", r"users \((\d+) firewalled\) share", int),
+    ("open_connections", r"open connections: (\d+)", int),
+    ("memory_used", r"used: (\d+) ", int),
+    ("memory_free", r"free: (\d+) ", int),
+    ("memory_max", r"max : (\d+) ", int),
+    ("upspeed_last_10_sec", r"upspeed last 10 sec: (\d+\.\d+) ", float),
+    ("downspeed_last_10_sec", r"downspeed last 10 sec: (\d+\.\d+) ", float),
+    ("sended_sources", r"sended sources: (\d+)", int),
+    ("sended_local_sources", r"sended local sources: (\d+)", int),
+    ("sended_searchmessages", r"sended searchmessages: (\d+)", int),
+    ("sended_firewallmessages", r"sended firewallmessages: (\d+)", int),
+    ("sended_messages", r"sended messages: (\d+)", int),
+    ("messagesize", r"messagesize: (\d+)", int),
+    ("responded_i_asks", r"responded i-asks: (\d+)", int),
+    ("searches", r"searches: (\d+)", int),
+    ("open_sockettasks", r"open sockettasks: (\d+)", int),
+)
+LEGACY_STATUS_KEYS = tuple(key for key, _, _ in LEGACY_STATUS_PATTERNS) + ("serverstatus_ok",)
+
+LEGACY_INFO_FIELDS = {
+    "globaluser": int,
+    "globalfilecount": int,
+    "globalfilesize": lambda value: int(float(value)),
+    "user": int,
+    "filecount": int,
+    "filesize": lambda value: int(float(value)),
+}
+
+# incomplete documents the current parsers have to read without raising, with the values they return
+MISSING_FIELDS_INFO = (
+    ("<applejuiceserver><user>5</user></applejuiceserver>", {"user": 5}),
+    ("<applejuiceserver/>", {}),
+    ("<other><user>5</user></other>", {}),
+)
+MISSING_FIELDS_STATUS = (
+    ("<p>open connections: 1611</p>", {"open_connections": 1611, "serverstatus_ok": False}),
+    ("", {"serverstatus_ok": False}),
+)
+
+
+def load_parser():
+    """Import parser.py on its own, without the integration package and Home Assistant."""
+    spec = importlib.util.spec_from_file_location("applejuice_parser", PARSER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_parse_status(text: str) -> dict:
+    """The status page as it was parsed before, one regex search over the whole page per field."""
+    parsed = {}
+    for key, pattern, convert in LEGACY_STATUS_PATTERNS:
+        match = re.compile(pattern).search(text)
+        parsed[key] = convert(match.group(1)) if match else None
+    parsed["serverstatus_ok"] = ">ok<" in text
+    return parsed
+
+
+def legacy_parse_info(text: str) -> dict:
+    """/info.xml as it was parsed before, converted to nested dicts by xmltodict."""
+    applejuiceserver = xmltodict.parse(text).get("applejuiceserver")
+    if applejuiceserver is None:
+        return dict.fromkeys(LEGACY_INFO_FIELDS)
+    return {key: convert(applejuiceserver.get(key)) for key, convert in LEGACY_INFO_FIELDS.items()}
+
+
+def counters_last(page: str) -> str:
+    """The same page with the server list moved in front of the counters."""
+    start = page.rindex("<table>")
+    end = page.rindex("</table>") + len("</table>")
+    servers = page[start:end]
+    head, _, tail = (page[:start] + page[end:]).partition("<p>uptime")
+    return f"{head}{servers}\n<p>uptime{tail}"
+
+
+def measure(parse, text: str, number: int, repeat: int) -> tuple[float, int]:
+    """Best time per parse in µs, and the peak bytes allocated by a single parse."""
+    best = min(timeit.repeat(lambda: parse(text), number=number, repeat=repeat)) / number
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    parse(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1e6, peak
+
+
+def compare(name: str, text: str, legacy, current) -> bool:
+    """Check that both parsers agree on a page, report the differences otherwise."""
+    expected, actual = legacy(text), current(text)
+    if expected == actual:
+        return True
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key) != actual.get(key):
+            print(f"{name}: {key} is {actual.get(key)!r}, expected {expected.get(key)!r}", file=sys.stderr)
+    return False
+
+
+def check_missing_fields(parser) -> bool:
+    """Check that fields missing from a document are None."""
+    ok = True
+    for parse, keys, cases in (
+        (parser.parse_info, parser.INFO_FIELDS, MISSING_FIELDS_INFO),
+        (parser.parse_status, LEGACY_STATUS_KEYS, MISSING_FIELDS_STATUS),
+    ):
+        for text, values in cases:
+            expected = {**dict.fromkeys(keys), **values}
+            try:
+                actual = parse(text)
+            except Exception as error:  # any error fails the check
+                actual = error
+            if actual != expected:
+                print(f"{parse.__name__}({text!r}) returned {actual!r}, expected {expected!r}", file=sys.stderr)
+                ok = False
+    return ok
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    """Command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload-size", type=int, nargs="+", default=[5000, 50000, 500000],
+                        help="approximate sizes of the status page (bytes)")
+    parser.add_argument("--number", type=int, default=200, help="parses per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs, the best one counts")
+    return parser.parse_args(args)
+
+
+def main(args: argparse.Namespace) -> int:
+    """Check and measure the old and current parsers on /info.xml and every status page size."""
+    parser = load_parser()
+    info = SimulatedServer(seed=0, payload_size=0).info()
+    pages = {}
+    for size in args.payload_size:
+        page = SimulatedServer(seed=size, payload_size=size).status()
+        pages[(size, "first")] = page
+        pages[(size, "last")] = counters_last(page)
+
+    if not check_missing_fields(parser):
+        return 1
+    if not compare("info", info, legacy_parse_info, parser.parse_info):
+        return 1
+    if not all(compare(f"status {size} counters {layout}", page, legacy_parse_status, parser.parse_status)
+               for (size, layout), page in pages.items()):
+        return 1
+
+    print(f"{'page':>10} {'counters':<9} {'parser':<9} {'µs/parse':>10} {'peak KiB':>9}")
+    for name, parse in (("xmltodict", legacy_parse_info), ("current", parser.parse_info)):
+        elapsed, peak = measure(parse, info, args.number, args.repeat)
+        print(f"{len(info):>10} {'info.xml':<9} {name:<9} {elapsed:>10.1f} {peak / 1024:>9.1f}")
+    for (size, layout), page in pages.items():
+        for name, parse in (("regex", legacy_parse_status), ("current", parser.parse_status)):
+            elapsed, peak = measure(parse, page, args.number, args.repeat)
+            print(f"{len(page):>10} {layout:<9} {name:<9} {elapsed:>10.1f} {peak / 1024:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
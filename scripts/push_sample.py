@@ -0,0 +1,52 @@
+"""Post sample status payloads to the push mode webhook of a config entry.
+
+The webhook path is shown in the options of the entry once push mode is enabled:
+
+    python scripts/push_sample.py http://localhost:8123/api/webhook/<webhook_id> --format json --count 10
+
+--format raw posts the status page as served by /status_raw.htm instead of the JSON object.
+"""
+
+import argparse
+import asyncio
+import json
+
+import aiohttp
+
+from standin_server import SimulatedServer
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    """Command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url", help="full webhook url")
+    parser.add_argument("--format", choices=("json", "raw"), default="json")
+    parser.add_argument("--count", type=int, default=1, help="number of payloads to post")
+    parser.add_argument("--interval", type=float, default=5.0, help="time between two payloads (s)")
+    parser.add_argument("--payload-size", type=int, default=5000, help="approximate size of a raw status page (bytes)")
+    return parser.parse_args(args)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Post the payloads and print the responses."""
+    server = SimulatedServer(0, args.payload_size)
+
+    async with aiohttp.ClientSession() as session:
+        for index in range(args.count):
+            if index:
+                await asyncio.sleep(args.interval)
+            server.advance()
+
+            if args.format == "json":
+                request = session.post(args.url, data=json.dumps(server.status_values()),
+                                       headers={"Content-Type": "application/json"})
+            else:
+                request = session.post(args.url, data=server.status(),
+                                       headers={"Content-Type": "text/html; charset=utf-8"})
+
+            async with request as response:
+                print(f"{index + 1}/{args.count}: {response.status} {await response.text()}".rstrip(), flush=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
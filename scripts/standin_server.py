@@ -0,0 +1,229 @@
+"""Local stand-in for one or more appleJuice Servers.
+
+Serves /info.xml and /status_raw.htm in the layout of a real server, with values that move
+between requests, so the integration can be run and measured without a real server.
+
+    python scripts/standin_server.py --servers 10 --port 9851 --latency 0.05 --jitter 0.02
+
+Every simulated server listens on its own port, starting at --port. Any username and password
+are accepted.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from aiohttp import web
+
+INFO_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<applejuiceserver>
+<globaluser>{globaluser}</globaluser>
+<globalfilecount>{globalfilecount}</globalfilecount>
+<globalfilesize>{globalfilesize:.6E}</globalfilesize>
+<user>{user}</user>
+<filecount>{filecount}</filecount>
+<filesize>{filesize:.1f}</filesize>
+<version>0.31.149.112</version>
+<uptime>{uptime}</uptime>
+</applejuiceserver>
+"""
+
+STATUS_PAGE = """<html><head><title>appleJuice Server</title></head><body>
+<h1>appleJuice Server 0.31.149.112</h1>
+<table><tr><td>serverstatus</td><td><font color="green">ok</font></td></tr></table>
+<p>uptime: {uptime}</p>
+<p>{user} users ({firewalled} firewalled) share {filecount} files with {share_tb:.2f} TB</p>
+<p>open connections: {open_connections}<br>open sockettasks: {open_sockettasks}</p>
+<p>memory used: {memory_used} KB free: {memory_free} KB max : {memory_max} KB</p>
+<p>upspeed last 10 sec: {upspeed:.4f} kb/s<br>downspeed last 10 sec: {downspeed:.4f} kb/s</p>
+<p>sended sources: {sended_sources}<br>sended local sources: {sended_local_sources}<br>
+sended searchmessages: {sended_searchmessages}<br>sended firewallmessages: {sended_firewallmessages}<br>
+sended messages: {sended_messages}<br>messagesize: 5123<br>
+responded i-asks: {responded_i_asks}<br>searches: {searches}</p>
+<table>
+{servers}</table>
+</body></html>"""
+
+SERVER_ROW = "<tr><td>server {index}</td><td>10.0.{high}.{low}:9851</td><td>{users} users</td></tr>\n"
+
+MEMORY_MAX = 1048576
+COUNTERS = (
+    "sended_sources",
+    "sended_local_sources",
+    "sended_searchmessages",
+    "sended_firewallmessages",
+    "sended_messages",
+    "responded_i_asks",
+    "searches",
+)
+
+
+class SimulatedServer:
+    """State of one simulated server, advanced a little on every request."""
+
+    def __init__(self, seed: int, payload_size: int):
+        """Init."""
+        self._random = random.Random(seed)
+        self._started = time.time()
+        self.values = {
+            "globaluser": self._random.randint(20000, 60000),
+            "globalfilecount": self._random.randint(10 ** 8, 10 ** 9),
+            "user": self._random.randint(500, 3000),
+            "open_connections": self._random.randint(500, 3000),
+            "open_sockettasks": self._random.randint(10, 80),
+            "memory_used": self._random.randint(100000, 600000),
+            "upspeed": self._random.uniform(50, 500),
+            "downspeed": self._random.uniform(50, 500),
+            **{counter: self._random.randint(10 ** 5, 10 ** 8) for counter in COUNTERS},
+        }
+        self._rows = self._server_rows(payload_size)
+
+    def _server_rows(self, payload_size: int) -> str:
+        """Server list padding the status page to roughly `payload_size` bytes."""
+        rows = []
+        size = len(STATUS_PAGE)
+        index = 0
+        while size < payload_size:
+            row = SERVER_ROW.format(index=index, high=index // 255, low=index % 255, users=index * 37)
+            rows.append(row)
+            size += len(row)
+            index += 1
+        return "".join(rows)
+
+    def _walk(self, key: str, step: float, minimum: float = 0) -> None:
+        value = self.values[key] + self._random.uniform(-step, step)
+        self.values[key] = max(minimum, type(self.values[key])(value))
+
+    def advance(self) -> None:
+        """Move the gauges a little and let the counters grow."""
+        self._walk("globaluser", 50, 1)
+        self._walk("user", 10, 1)
+        self._walk("open_connections", 25, 1)
+        self._walk("open_sockettasks", 3)
+        self._walk("memory_used", 2000, 1)
+        self.values["memory_used"] = min(self.values["memory_used"], MEMORY_MAX)
+        self._walk("upspeed", 20)
+        self._walk("downspeed", 20)
+        for counter in COUNTERS:
+            self.values[counter] += self._random.randint(0, 500)
+
+    def info(self) -> str:
+        """Render /info.xml."""
+        values = self.values
+        return INFO_XML.format(
+            globaluser=values["globaluser"],
+            globalfilecount=values["globalfilecount"],
+            globalfilesize=values["globalfilecount"] * 8.8e6,
+            user=values["user"],
+            filecount=values["user"] * 1561,
+            filesize=values["user"] * 1561 * 3.7e5,
+            uptime=int(time.time() - self._started),
+        )
+
+    def status(self) -> str:
+        """Render /status_raw.htm."""
+        values = self.values
+        uptime = int(time.time() - self._started)
+        return STATUS_PAGE.format(
+            uptime=f"{uptime // 86400} days {uptime % 86400 // 3600:02}:{uptime % 3600 // 60:02}:{uptime % 60:02}",
+            user=values["user"],
+            firewalled=values["user"] // 4,
+            filecount=values["user"] * 1561,
+            share_tb=values["user"] * 1561 * 3.7e5 / 1e12,
+            open_connections=values["open_connections"],
+            open_sockettasks=values["open_sockettasks"],
+            memory_used=values["memory_used"],
+            memory_free=MEMORY_MAX - values["memory_used"],
+            memory_max=MEMORY_MAX,
+            upspeed=values["upspeed"],
+            downspeed=values["downspeed"],
+            servers=self._rows,
+            **{counter: values[counter] for counter in COUNTERS},
+        )
+
+    def status_values(self) -> dict:
+        """The status as a JSON object, keyed like the integration's parsed status page."""
+        values = self.values
+        return {
+            "firewalled": values["user"] // 4,
+            "open_connections": values["open_connections"],
+            "open_sockettasks": values["open_sockettasks"],
+            "memory_used": values["memory_used"],
+            "memory_free": MEMORY_MAX - values["memory_used"],
+            "memory_max": MEMORY_MAX,
+            "upspeed_last_10_sec": round(values["upspeed"], 4),
+            "downspeed_last_10_sec": round(values["downspeed"], 4),
+            "messagesize": 5123,
+            "serverstatus_ok": True,
+            **{counter: values[counter] for counter in COUNTERS},
+        }
+
+
+def create_app(server: SimulatedServer, latency: float, jitter: float, error_rate: float) -> web.Application:
+    """Application serving the pages of one simulated server."""
+
+    async def respond(render, content_type: str) -> web.Response:
+        delay = latency + random.uniform(-jitter, jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if random.random() < error_rate:
+            raise web.HTTPInternalServerError()
+        server.advance()
+        return web.Response(text=render(), content_type=content_type, charset="utf-8")
+
+    async def info(request: web.Request) -> web.Response:
+        return await respond(server.info, "text/xml")
+
+    async def status(request: web.Request) -> web.Response:
+        return await respond(server.status, "text/html")
+
+    app = web.Application()
+    app.router.add_get("/info.xml", info)
+    app.router.add_get("/status_raw.htm", status)
+    return app
+
+
+async def start_servers(count: int, port: int, host: str = "127.0.0.1", latency: float = 0.0, jitter: float = 0.0,
+                        error_rate: float = 0.0, payload_size: int = 5000) -> list[web.AppRunner]:
+    """Start `count` simulated servers on consecutive ports, return their runners for cleanup."""
+    runners = []
+    for index in range(count):
+        app = create_app(SimulatedServer(index, payload_size), latency, jitter, error_rate)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port + index).start()
+        runners.append(runner)
+    return runners
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    """Command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", type=int, default=1, help="number of simulated servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9851, help="port of the first server")
+    parser.add_argument("--latency", type=float, default=0.0, help="response delay (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- added to the delay (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--payload-size", type=int, default=5000, help="approximate size of the status page (bytes)")
+    return parser.parse_args(args)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the servers until interrupted."""
+    runners = await start_servers(args.servers, args.port, args.host, args.latency, args.jitter,
+                                  args.error_rate, args.payload_size)
+    print(f"serving {args.servers} server(s) on {args.host}:{args.port}-{args.port + args.servers - 1}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        pass